@@ -0,0 +1,245 @@
+"""
+asyncio crawl engine for DecathlonReviewScraper
+
+Keeps many product and review page requests in flight from one process.
+A global semaphore caps the total number of requests and a per-host
+semaphore keeps us from hammering a single host. With a PolitenessScheduler
+each request also waits for its host's token bucket, and per_host becomes
+the ceiling of the scheduler's adaptive concurrency. Pages are parsed as
+they arrive and finished products are streamed to the scraper's writers.
+"""
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+import aiohttp
+from http_fetcher import USER_AGENT, review_page_url, cutoff_search
+from politeness import THROTTLE_STATUSES, retry_after_seconds
+from static_parser import parse_product_page
+
+
+class AsyncCrawlEngine:
+    """Crawls products concurrently and feeds results into a DecathlonReviewScraper"""
+
+    def __init__(self, scraper, concurrency=20, per_host=8, page_window=4, timeout=15, politeness=None):
+        self.scraper = scraper
+        self.politeness = politeness  # Optional PolitenessScheduler shared with the scraper
+        self.concurrency = concurrency  # Requests in flight across all hosts
+        self.per_host = per_host  # Requests in flight per host
+        self.page_window = page_window  # Review pages of one product fetched at once
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.stats = {'requests': 0, 'errors': 0, 'bytes': 0, 'pages': 0}
+
+        self._global = None
+        self._hosts = {}
+
+    def _host_semaphore(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def fetch(self, session, url):
+        """GET a page under the global and per-host limits. Returns None on failure.
+        With a politeness scheduler, throttled requests are retried at its slower pace"""
+        for _ in range(2 if self.politeness is not None else 0):
+            page_html = await self.fetch_once(session, url)
+            if page_html not in THROTTLE_STATUSES:
+                return page_html
+            print(f"  🚦 {url}: HTTP {page_html}, retrying at a slower pace")
+        page_html = await self.fetch_once(session, url)
+        return page_html if isinstance(page_html, str) else None
+
+    async def fetch_once(self, session, url):
+        """The page text, None on failure, or the status of a throttle response (to retry)"""
+        async with self._global, self._host_semaphore(url):
+            if self.politeness is not None:
+                await self.politeness.acquire_async(url)
+            self.stats['requests'] += 1
+            start = time.perf_counter()
+            try:
+                async with session.get(url) as response:
+                    body = await response.read()
+                    if self.politeness is not None:
+                        self.politeness.release(url, time.perf_counter() - start, status=response.status,
+                                                retry_after=retry_after_seconds(response.headers.get('Retry-After')))
+                    if response.status >= 400:
+                        self.stats['errors'] += 1
+                        print(f"  ⚠️ {url}: HTTP {response.status}")
+                        return response.status if response.status in THROTTLE_STATUSES else None
+                    self.stats['bytes'] += len(body)
+                    return body.decode(response.charset or 'utf-8', errors='replace')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if self.politeness is not None:
+                    self.politeness.release(url, time.perf_counter() - start, error=True)
+                self.stats['errors'] += 1
+                print(f"  ⚠️ {url}: {e}")
+                return None
+
+    async def fetch_page(self, session, url, page_number):
+        metrics = self.scraper.metrics
+        with metrics.span('fetch', product=url):
+            page_html = await self.fetch(session, review_page_url(url, page_number))
+        if page_html is None:
+            return None
+        self.stats['pages'] += 1
+        metrics.count('pages', product=url)
+        if self.scraper.snapshot_cache is not None:
+            with metrics.span('snapshot', product=url):
+                self.scraper.snapshot_cache.put('reviews', url, page_number, page_html)
+        with metrics.span('parse', product=url):
+            return parse_product_page(page_html)
+
+    async def find_cutoff_page(self, session, url, first_page):
+        """Last page inside the 6-month window, and the pages fetched to find it"""
+        probed = {1: first_page}
+        search = cutoff_search(self.scraper.max_pages)
+        try:
+            page_number = next(search)
+            while True:
+                if page_number not in probed:
+                    probed[page_number] = await self.fetch_page(session, url, page_number)
+                page = probed[page_number]
+                in_window = bool(page and page['reviews']) and not self.scraper.page_is_all_old(page['reviews'])
+                page_number = search.send(in_window)
+        except StopIteration as done:
+            return done.value, probed
+
+    async def crawl_product(self, session, url, results):
+        # Coroutines share one thread, so spans name their product explicitly
+        with self.scraper.metrics.product(url, bind=False):
+            await self.scrape_product(session, url, results)
+
+    async def scrape_product(self, session, url, results):
+        scraper = self.scraper
+        product_info = scraper.extract_product_info_from_url(url)
+        if not product_info:
+            print(f"✗ Failed to extract product info: {url}")
+            return
+
+        first_page = await self.fetch_page(session, url, 1)
+        if first_page is None:
+            return
+
+        summary = scraper.new_summary(product_info, first_page['price'], first_page['thumbnail_url'])
+        product_reviews = []
+        partial = scraper.checkpoint.get(url) if scraper.checkpoint else None
+        if partial and partial['summary'] and partial['page'] > 0:
+            # Interrupted product: keep its checkpointed rows and crawl again from page 1; the dedup
+            # index skips the rows already written, so the sink never gets them twice
+            for review_data in partial['rows']:
+                product_reviews.append(review_data)
+                scraper.add_to_summary(summary, review_data)
+            scraper.dedup.add_all(partial['rows'])
+            if not scraper.sink.keeps_previous:
+                scraper.sink.write_rows(partial['rows'])
+            print(f"♻️ {url}: {len(product_reviews)} reviews from the checkpoint")
+        elif scraper.checkpoint:
+            scraper.checkpoint.start_product(url, summary)
+        page_number = 1
+        try:
+            page_number = await self.scrape_pages(session, url, product_info, first_page, summary, product_reviews)
+        except Exception as e:
+            # The pages done so far are already in the sink: finish the product with them, like the
+            # browser backend does after a page error
+            print(f"❌ Error scraping {url}: {e}; keeping its {len(product_reviews)} reviews")
+        await results.put((url, summary, product_reviews, page_number))
+
+    async def scrape_pages(self, session, url, product_info, first_page, summary, product_reviews):
+        """Walk the review pages, adding rows to product_reviews/summary. Returns the last page"""
+        scraper = self.scraper
+        pending = [(1, first_page)]
+        page_number = 1
+        last_page = None
+        if scraper.pagination == 'direct':
+            # Find the cutoff first, then fetch exactly the pages inside the window at once
+            with scraper.metrics.span('cutoff_search', product=url):
+                last_page, probed = await self.find_cutoff_page(session, url, first_page)
+            missing = [n for n in range(2, last_page + 1) if n not in probed]
+            probed.update(zip(missing, await asyncio.gather(*(self.fetch_page(session, url, n) for n in missing))))
+            pending = []
+            for n in range(1, last_page + 1):
+                if probed.get(n) is None:
+                    break
+                pending.append((n, probed[n]))
+        reached_known_reviews = False  # Incremental mode: the rest was collected by a previous run
+
+        while pending:
+            stop = False
+            for page_number, page in pending:
+                page_start = len(product_reviews)
+                build_start = time.perf_counter()
+                for raw_review in page['reviews']:
+                    review_data, is_old = scraper.build_review(raw_review, product_info)
+                    if review_data and scraper.state and scraper.state.is_known(review_data):
+                        reached_known_reviews = True
+                        break
+                    if review_data and not scraper.dedup.add(review_data):
+                        scraper.metrics.count('duplicate_reviews', product=url)
+                        continue
+                    if review_data:
+                        product_reviews.append(review_data)
+                        scraper.add_to_summary(summary, review_data)
+                scraper.metrics.record('build_reviews', time.perf_counter() - build_start, product=url)
+                page_rows = product_reviews[page_start:]
+                scraper.metrics.count('reviews', len(page_rows), product=url)
+                scraper.sink.write_rows(page_rows)
+                if scraper.checkpoint:
+                    scraper.sink.flush()
+                    scraper.checkpoint.page_done(url, page_number, page_rows)
+                if (reached_known_reviews or not page['reviews'] or not page['has_next']
+                        or scraper.page_is_all_old(page['reviews'])):
+                    stop = True
+                    break
+            if stop or page_number >= scraper.max_pages or last_page is not None:
+                break
+
+            # Fetch the next few pages together; reviews are newest first so at most
+            # page_window - 1 pages past the 6-month cutoff are wasted
+            window = range(page_number + 1, min(page_number + self.page_window, scraper.max_pages) + 1)
+            pages = await asyncio.gather(*(self.fetch_page(session, url, n) for n in window))
+            pending = []
+            for n, next_page in zip(window, pages):
+                if next_page is None:
+                    break
+                pending.append((n, next_page))
+        return page_number
+
+    async def write_results(self, results, total):
+        """Single consumer that streams finished products to the scraper's writers"""
+        done = 0
+        while True:
+            item = await results.get()
+            if item is None:
+                return
+            url, summary, product_reviews, pages = item
+            self.scraper.finish_product(url, summary, product_reviews)
+            done += 1
+            print(f"✅ [{done}/{total}] {summary['product_id']}: "
+                  f"{len(product_reviews)} reviews from {pages} page(s)")
+
+    async def crawl(self, product_urls):
+        self._global = asyncio.Semaphore(self.concurrency)
+        self._hosts = {}
+        results = asyncio.Queue()
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        headers = {'User-Agent': USER_AGENT, 'Accept-Language': 'ko-KR,ko;q=0.9'}
+
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                         headers=headers) as session:
+            writer = asyncio.create_task(self.write_results(results, len(product_urls)))
+            outcomes = await asyncio.gather(*(self.crawl_product(session, url, results) for url in product_urls),
+                                            return_exceptions=True)
+            for url, outcome in zip(product_urls, outcomes):
+                if isinstance(outcome, Exception):
+                    print(f"❌ Error scraping {url}: {outcome}")
+            await results.put(None)
+            await writer
+
+    def run(self, product_urls):
+        start = time.perf_counter()
+        asyncio.run(self.crawl(product_urls))
+        elapsed = time.perf_counter() - start
+        print(f"\n⚡ {self.stats['pages']} pages in {elapsed:.1f}s "
+              f"({self.stats['requests']} requests, {self.stats['errors']} errors, "
+              f"{self.stats['bytes'] / 1024:.0f} KB)")
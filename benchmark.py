@@ -0,0 +1,229 @@
+"""
+Throughput benchmark for DecathlonReviewScraper against a local synthetic site
+
+Starts a fixture server with generated products (fixture_server.SyntheticCatalog)
+in a separate process, scrapes it end to end with the chosen backend, then
+times each phase on its own (fetch, parse, build reviews) so a regression can
+be traced to where it happened. Save results with --output and compare the
+next run against them with --compare:
+
+    python benchmark.py --backend http --products 20 --pages 10 --reviews 20 --output before.json
+    python benchmark.py --backend http --products 20 --pages 10 --reviews 20 --compare before.json
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import threading
+import time
+from datetime import datetime
+import requests
+from fixture_server import FixtureServer, SyntheticCatalog
+from http_fetcher import review_page_url
+from static_parser import parse_product_page
+from decathlon_crawler import DecathlonReviewScraper
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (Chrome's own memory is not included)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if platform.system() == 'Darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        memory = psutil.Process().memory_info()
+        return getattr(memory, 'peak_wset', memory.rss) / 1024 / 1024
+    except ImportError:
+        return None
+
+
+def latency_stats(samples):
+    """Per-item latency in milliseconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean_ms': statistics.mean(ordered) * 1000,
+        'p50_ms': ordered[len(ordered) // 2] * 1000,
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        'max_ms': ordered[-1] * 1000
+    }
+
+
+def serve_catalog(catalog, latency, ready, stop, served):
+    server = FixtureServer(latency=latency, synthetic=catalog)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ready.put(server.base_url)
+    stop.wait()
+    server.shutdown()
+    served.value = server.requests_served
+    server.server_close()
+
+
+@contextlib.contextmanager
+def fixture_site(catalog, latency):
+    """Run the synthetic site in its own process so it does not compete for our GIL"""
+    ready = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    served = multiprocessing.Value('i', 0)
+    process = multiprocessing.Process(target=serve_catalog, args=(catalog, latency, ready, stop, served),
+                                      daemon=True)
+    process.start()
+    base_url = ready.get(timeout=10)
+    site = {'base_url': base_url, 'urls': [base_url + path for path in catalog.product_paths()]}
+    try:
+        yield site
+    finally:
+        stop.set()
+        process.join(timeout=5)
+        site['requests_served'] = served.value
+
+
+def run_end_to_end(urls, backend, workers, max_pages, quiet):
+    scraper = DecathlonReviewScraper(headless=True, max_pages=max_pages, workers=workers, backend=backend,
+                                     http_fallback=False, lean=True)
+    scraper.product_delay = 0
+    output = open(os.devnull, 'w', encoding='utf-8') if quiet else None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+            scraper.scrape_all_products(urls)
+    finally:
+        elapsed = time.perf_counter() - start
+        scraper.close()
+        if output:
+            output.close()
+    return scraper, elapsed
+
+
+def run_phases(urls, pages, scraper):
+    """Time fetch, parse and review building separately, one page at a time"""
+    session = requests.Session()
+    fetch_times, parse_times, build_times = [], [], []
+    pages_html = []
+    for url in urls:
+        for page_number in range(1, pages + 1):
+            start = time.perf_counter()
+            response = session.get(review_page_url(url, page_number), timeout=15)
+            response.encoding = 'utf-8'
+            pages_html.append((url, response.text))
+            fetch_times.append(time.perf_counter() - start)
+    session.close()
+
+    with open(os.devnull, 'w', encoding='utf-8') as output, contextlib.redirect_stdout(output):
+        for url, page_html in pages_html:
+            start = time.perf_counter()
+            page = parse_product_page(page_html)
+            parse_times.append(time.perf_counter() - start)
+
+            product_info = scraper.extract_product_info_from_url(url)
+            start = time.perf_counter()
+            for raw_review in page['reviews']:
+                scraper.build_review(raw_review, product_info)
+            build_times.append(time.perf_counter() - start)
+
+    return {
+        'fetch': latency_stats(fetch_times),
+        'parse': latency_stats(parse_times),
+        'build_reviews': latency_stats(build_times)
+    }
+
+
+def run_benchmark(args):
+    # Spread the reviews over 170 days so every page is inside the 6-month window
+    total_reviews = args.pages * args.reviews
+    catalog = SyntheticCatalog(args.products, args.pages, args.reviews,
+                               review_interval=min(0.5, 170 / max(1, total_reviews)))
+
+    with fixture_site(catalog, args.latency) as site:
+        scraper, elapsed = run_end_to_end(site['urls'], args.backend, args.workers, args.pages, args.quiet)
+        rss_after_crawl = peak_rss_mb()
+        phases = run_phases(site['urls'], args.pages, scraper) if not args.skip_phases else {}
+    pages = site['requests_served'] - (args.products * args.pages if phases else 0)
+
+    reviews = scraper.sink.count
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'config': {
+            'backend': args.backend, 'workers': args.workers, 'products': args.products,
+            'pages': args.pages, 'reviews_per_page': args.reviews, 'latency': args.latency
+        },
+        'elapsed_s': elapsed,
+        'pages': pages,
+        'reviews': reviews,
+        'pages_per_s': pages / elapsed if elapsed else 0.0,
+        'reviews_per_s': reviews / elapsed if elapsed else 0.0,
+        'peak_rss_mb': rss_after_crawl,
+        'phases': phases,
+        'crawl_phases': scraper.metrics.to_dict()['phases']
+    }
+
+
+def print_results(result, baseline=None):
+    def delta(key):
+        if not baseline or not baseline.get(key):
+            return ''
+        change = (result[key] - baseline[key]) / baseline[key] * 100
+        return f"  ({change:+.1f}% vs baseline)"
+
+    config = result['config']
+    print(f"\n{'='*70}")
+    print(f"📈 BENCHMARK: backend={config['backend']} workers={config['workers']} "
+          f"{config['products']} products x {config['pages']} pages x {config['reviews_per_page']} reviews, "
+          f"latency {config['latency'] * 1000:.0f} ms")
+    print(f"{'='*70}")
+    print(f"  Elapsed:      {result['elapsed_s']:.2f}s{delta('elapsed_s')}")
+    print(f"  Pages:        {result['pages']}  →  {result['pages_per_s']:.1f} pages/s{delta('pages_per_s')}")
+    print(f"  Reviews:      {result['reviews']}  →  {result['reviews_per_s']:.1f} reviews/s{delta('reviews_per_s')}")
+    if result['peak_rss_mb'] is not None:
+        print(f"  Peak RSS:     {result['peak_rss_mb']:.1f} MB{delta('peak_rss_mb')}")
+    if result['phases']:
+        print(f"\n  Per-page phase latency (ms):")
+        print(f"  {'phase':<15}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}")
+        for name, stats in result['phases'].items():
+            print(f"  {name:<15}{stats['mean_ms']:>9.2f}{stats['p50_ms']:>9.2f}"
+                  f"{stats['p95_ms']:>9.2f}{stats['max_ms']:>9.2f}")
+    if result.get('crawl_phases'):
+        print(f"\n  Time inside the crawl by phase (s):")
+        for name, entry in sorted(result['crawl_phases'].items(), key=lambda item: -item[1]['total']):
+            print(f"  {name:<18}{entry['total']:>9.3f}  {entry['count']}x")
+    print(f"{'='*70}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the review scraper against a local synthetic site')
+    parser.add_argument('--backend', default='http', choices=['http', 'async', 'selenium'])
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--products', type=int, default=10)
+    parser.add_argument('--pages', type=int, default=5, help='Review pages per product')
+    parser.add_argument('--reviews', type=int, default=20, help='Reviews per page')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--skip-phases', action='store_true', help='Only run the end-to-end crawl')
+    parser.add_argument('--verbose', dest='quiet', action='store_false', help="Show the scraper's output")
+    parser.add_argument('--output', help='Save the results as JSON')
+    parser.add_argument('--compare', help='Previous --output file to compare against')
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(result, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"💾 Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
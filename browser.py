@@ -0,0 +1,402 @@
+"""
+Chrome sessions for the Decathlon crawlers
+
+create_driver builds the Chrome session both crawlers use. With lean=True
+the session only fetches what extraction needs: images, media, fonts and
+third-party trackers are blocked through the DevTools protocol, the page
+load strategy is 'eager' (DOM ready, not every subresource) and headless
+runs use Chrome's new headless mode. TrafficMeter adds up the bytes of
+every response from Chrome's network events (the performance log, enabled
+in both modes) and reads page load times from the navigation timing.
+
+TabPool runs concurrent product jobs as tabs of one Chrome instead of one
+Chrome per job. WebDriver talks to one window at a time, so each Tab
+selects its window before every command under a shared lock; navigation
+is started without blocking and waited for outside the lock, so page loads
+of different tabs overlap.
+
+DriverWatchdog decides when a long-lived Chrome should be replaced: after a
+number of pages, above a memory limit (browser RSS via psutil) or after a
+command hung. The crawlers restart their driver and carry on at the same
+product and review page.
+"""
+
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.remote.webelement import WebElement
+try:
+    import psutil
+except ImportError:  # Only needed for the watchdog's memory limit
+    psutil = None
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from http_fetcher import USER_AGENT
+
+# Network.setBlockedURLs patterns: we only need the DOM text and the thumbnail URL string
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*facebook.com/tr*', '*hotjar.com*', '*criteo.*',
+    '*kakao.com/v1/pixel*', '*analytics.tiktok.com*', '*bat.bing.com*',
+    '*contentsquare.net*', '*datadoghq*'
+]
+
+# Load time of the current document, reported once per navigation
+PAGE_LOAD_JS = """
+if (window.__trafficNavigationRead) return null;
+window.__trafficNavigationRead = true;
+var nav = performance.getEntriesByType('navigation')[0];
+return nav ? (nav.domContentLoadedEventEnd || nav.responseEnd) : null;
+"""
+
+
+# Chrome slows down timers and rendering of tabs that are not in front
+BACKGROUND_TAB_ARGUMENTS = [
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding'
+]
+
+# Tab.get: start a navigation and mark the old document, so the wait can tell the new one apart
+START_NAVIGATION_JS = "window.__tabNavigation = arguments[1]; window.location.href = arguments[0];"
+NAVIGATION_DONE_JS = """
+return window.__tabNavigation !== arguments[0] && document.readyState !== 'loading';
+"""
+
+
+def chrome_options(headless=False, lean=False, background_tabs=False):
+    options = Options()
+    if headless:
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1920,1080')
+    else:
+        options.add_argument('--start-maximized')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument(f'--user-agent={USER_AGENT}')
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    # Network events for TrafficMeter: bytes of every response, including cross-origin ones
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if lean:
+        options.page_load_strategy = 'eager'
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--mute-audio')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-background-networking')
+        options.add_argument('--disable-component-update')
+        options.add_argument('--disable-default-apps')
+        options.add_argument('--disable-sync')
+        options.add_argument('--metrics-recording-only')
+        options.add_argument('--no-first-run')
+    if background_tabs:
+        for argument in BACKGROUND_TAB_ARGUMENTS:
+            options.add_argument(argument)
+    return options
+
+
+def block_resources(driver, patterns=None):
+    """Block requests matching the URL patterns for every page this session loads"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns or BLOCKED_URL_PATTERNS})
+        return True
+    except WebDriverException as e:
+        print(f"⚠️ Resource blocking unavailable: {e}")
+        return False
+
+
+def create_driver(headless=False, lean=False, background_tabs=False):
+    """Start Chrome. lean=True blocks images/media/fonts/trackers and loads eagerly"""
+    driver = webdriver.Chrome(options=chrome_options(headless, lean, background_tabs))
+    if not headless:
+        driver.maximize_window()
+    if lean:
+        block_resources(driver)
+    return driver
+
+
+def network_traffic(log_entries):
+    """Bytes and count of the responses finished in a batch of performance log entries"""
+    total, responses = 0, 0
+    for entry in log_entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        if message.get('method') == 'Network.loadingFinished':
+            total += message.get('params', {}).get('encodedDataLength') or 0
+            responses += 1
+    return int(total), responses
+
+
+class TrafficMeter:
+    """Per-run bytes transferred (Chrome's network events) and page load times"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.stats = {'pages': 0, 'bytes': 0, 'resources': 0, 'load_ms': []}
+        self._lock = threading.Lock()
+
+    def share_stats(self, other):
+        """Record into another meter's stats (used by parallel workers)"""
+        self.stats = other.stats
+        self._lock = other._lock
+
+    def record(self):
+        """Account for everything loaded since the previous call. Returns the page's bytes"""
+        if self.driver is None:
+            return 0
+        try:
+            # Reading the performance log empties it, so every response is counted once
+            page_bytes, responses = network_traffic(self.driver.get_log('performance'))
+            load_ms = self.driver.execute_script(PAGE_LOAD_JS)
+        except WebDriverException:
+            return 0
+        with self._lock:
+            self.stats['pages'] += 1
+            self.stats['bytes'] += page_bytes
+            self.stats['resources'] += responses
+            if load_ms is not None:
+                self.stats['load_ms'].append(load_ms)
+        return page_bytes
+
+    def report(self):
+        stats = self.stats
+        if not stats['pages']:
+            return
+        loads = sorted(stats['load_ms'])
+        print(f"\n📶 Browser traffic: "
+              f"{stats['bytes'] / 1024 / 1024:.1f} MB over {stats['pages']} pages "
+              f"({stats['bytes'] / stats['pages'] / 1024:.0f} KB/page, {stats['resources']} resources)")
+        if loads:
+            print(f"  Page load: avg {sum(loads) / len(loads):.0f} ms, "
+                  f"median {loads[len(loads) // 2]:.0f} ms, max {loads[-1]:.0f} ms")
+
+
+class _TabBound:
+    """A WebDriver or WebElement whose every call runs with its tab selected"""
+
+    def __init__(self, tab, target):
+        self._tab = tab
+        self._target = target
+
+    def __getattr__(self, name):
+        with self._tab.selected():
+            value = getattr(self._target, name)  # Properties (text, page_source, ...) are read here
+        if not callable(value):
+            return self._tab.wrap(value)
+
+        def call(*args, **kwargs):
+            with self._tab.selected():
+                return self._tab.wrap(value(*self._tab.unwrap(args), **kwargs))
+        return call
+
+
+class Tab(_TabBound):
+    """One tab of a TabPool, usable wherever a driver is expected"""
+
+    def __init__(self, pool, handle):
+        super().__init__(self, pool.driver)
+        self.pool = pool
+        self.handle = handle
+
+    @contextmanager
+    def selected(self):
+        with self.pool.lock:
+            if self.pool.current_handle != self.handle:
+                self.pool.driver.switch_to.window(self.handle)
+                self.pool.current_handle = self.handle
+            yield
+
+    def wrap(self, value):
+        if isinstance(value, WebElement):
+            return _TabBound(self, value)
+        if isinstance(value, list):
+            return [self.wrap(item) for item in value]
+        return value
+
+    def unwrap(self, value):
+        if isinstance(value, _TabBound):
+            return value._target
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.unwrap(item) for item in value)
+        return value
+
+    def get(self, url, timeout=30):
+        """Navigate without holding the browser while the page loads"""
+        token = uuid.uuid4().hex
+        with self.selected():
+            self.pool.driver.execute_script(START_NAVIGATION_JS, url, token)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            try:
+                with self.selected():
+                    if self.pool.driver.execute_script(NAVIGATION_DONE_JS, token):
+                        return
+            except WebDriverException:
+                pass  # The old document went away mid-call
+        raise TimeoutException(f"Page load timed out after {timeout}s: {url}")
+
+    def quit(self):
+        self.pool.release(self)  # Tabs are returned to the pool, never quit the shared browser
+
+
+class TabPool:
+    """One Chrome, up to max_tabs tabs handed out to concurrent jobs"""
+
+    def __init__(self, headless=False, lean=False, max_tabs=4):
+        self.driver = create_driver(headless, lean, background_tabs=True)
+        self.max_tabs = max_tabs
+        self.lean = lean
+        self.lock = threading.RLock()  # One WebDriver command at a time, across all tabs
+        self.current_handle = self.driver.current_window_handle
+        self._free_handles = [self.current_handle]  # The window Chrome opened with is the first tab
+        self._slots = threading.BoundedSemaphore(max_tabs)
+        self._tabs = []  # Tabs handed out; changed under self.lock
+
+    def acquire(self, timeout=None):
+        """A tab for one job; blocks while max_tabs are in use"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutException(f"No free tab within {timeout}s ({self.max_tabs} in use)")
+        with self.lock:
+            if self._free_handles:
+                handle = self._free_handles.pop()
+            else:
+                self.driver.switch_to.new_window('tab')
+                handle = self.current_handle = self.driver.current_window_handle
+                if self.lean:
+                    block_resources(self.driver)  # CDP blocking is per target: each new tab needs its own
+            tab = Tab(self, handle)
+            self._tabs.append(tab)
+        return tab
+
+    def release(self, tab):
+        """Blank the tab (frees its page's memory) and make it available again"""
+        with self.lock:
+            if tab not in self._tabs:
+                return
+            self._tabs.remove(tab)
+        try:
+            with tab.selected():
+                self.driver.get('about:blank')
+        except WebDriverException:
+            pass
+        with self.lock:
+            self._free_handles.append(tab.handle)
+        self._slots.release()
+
+    @contextmanager
+    def tab(self, timeout=None):
+        tab = self.acquire(timeout)
+        try:
+            yield tab
+        finally:
+            self.release(tab)
+
+    def close(self):
+        self.driver.quit()
+
+
+class DriverWatchdog:
+    """Tracks one Chrome session's pages, memory and per-page latency and says when to restart it"""
+
+    def __init__(self, max_pages=300, max_rss_mb=1500, command_timeout=60, rss_every=10):
+        self.max_pages = max_pages  # Restart after this many pages (None: never)
+        self.max_rss_mb = max_rss_mb  # Restart when Chrome and its children use more (None: never)
+        self.command_timeout = command_timeout  # Page loads/scripts slower than this count as hung
+        self.rss_every = rss_every  # Pages between memory samples
+        self.driver = None
+        self.pages = 0
+        self.session = None
+        self.stats = {'restarts': {}, 'sessions': []}
+        self._lock = threading.Lock()
+        if max_rss_mb and psutil is None:
+            print("⚠️ psutil is not installed: the watchdog's memory limit is off (pip install psutil)")
+
+    def for_worker(self):
+        """Same limits for another worker's driver, recording into these stats"""
+        watchdog = DriverWatchdog(self.max_pages, self.max_rss_mb if psutil else None,
+                                  self.command_timeout, self.rss_every)
+        watchdog.stats = self.stats
+        watchdog._lock = self._lock
+        return watchdog
+
+    def attach(self, driver):
+        """Start watching a (new) driver"""
+        self.driver = driver
+        self.pages = 0
+        self.session = {'pages': 0, 'seconds': 0.0, 'peak_rss_mb': None, 'ended_by': None}
+        with self._lock:
+            self.stats['sessions'].append(self.session)
+        try:
+            driver.set_page_load_timeout(self.command_timeout)
+            driver.set_script_timeout(self.command_timeout)
+        except WebDriverException:
+            pass
+
+    def browser_rss_mb(self):
+        """Resident memory of chromedriver and every Chrome process under it"""
+        if psutil is None or self.driver is None:
+            return None
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass  # Renderers come and go
+        return total / 1024 / 1024
+
+    def record_page(self, seconds):
+        self.pages += 1
+        self.session['pages'] += 1
+        self.session['seconds'] += seconds
+
+    def check(self):
+        """Reason to restart now ('pages', 'memory'), or None"""
+        if self.max_pages and self.pages >= self.max_pages:
+            return 'pages'
+        if self.max_rss_mb and self.pages and self.pages % self.rss_every == 0:
+            rss = self.browser_rss_mb()
+            if rss is not None:
+                self.session['peak_rss_mb'] = max(self.session['peak_rss_mb'] or 0.0, rss)
+                if rss > self.max_rss_mb:
+                    return 'memory'
+        return None
+
+    def is_hang(self, error):
+        """A page load or script that ran into command_timeout, or a browser that stopped answering"""
+        if isinstance(error, TimeoutException):
+            return True
+        text = str(error).lower()
+        return isinstance(error, WebDriverException) and ('timed out' in text or 'disconnected' in text
+                                                          or 'not reachable' in text)
+
+    def restarted(self, reason):
+        """Close the current session's stats; attach() the replacement driver"""
+        with self._lock:
+            if self.session is not None:
+                self.session['ended_by'] = reason
+            self.stats['restarts'][reason] = self.stats['restarts'].get(reason, 0) + 1
+
+    def report(self):
+        sessions = [session for session in self.stats['sessions'] if session['pages']]
+        if not self.stats['restarts'] and len(sessions) <= 1:
+            return
+        print(f"\n🐕 Driver watchdog: {sum(self.stats['restarts'].values())} restarts "
+              f"({', '.join(f'{reason}: {n}' for reason, n in sorted(self.stats['restarts'].items()))})")
+        for number, session in enumerate(sessions, 1):
+            rss = f", peak {session['peak_rss_mb']:.0f} MB" if session['peak_rss_mb'] else ""
+            print(f"  session {number}: {session['pages']} pages, "
+                  f"avg {session['seconds'] / session['pages'] * 1000:.0f} ms/page{rss}"
+                  f"{', ended by ' + session['ended_by'] if session['ended_by'] else ''}")
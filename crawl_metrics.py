@@ -0,0 +1,188 @@
+"""
+Timing spans and crawl reports
+
+Wrap each phase of a crawl in `with metrics.span('navigation'):`. Spans roll up
+per product and per run; report() prints where the time went, write_json()
+saves the whole breakdown and write_prometheus() writes a node_exporter
+textfile so runs can be graphed and compared.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from crawl_state import write_json_atomic
+
+
+def _add(entry, seconds):
+    entry['count'] += 1
+    entry['total'] += seconds
+    entry['max'] = max(entry['max'], seconds)
+
+
+def _new_entry():
+    return {'count': 0, 'total': 0.0, 'max': 0.0}
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+class CrawlMetrics:
+    """Thread-safe per-phase timings, rolled up per product and per run"""
+
+    def __init__(self, crawler='reviews'):
+        self.crawler = crawler  # Label that tells the two crawlers apart in reports
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self.phases = {}
+        self.products = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def share(self, other):
+        """Record into another CrawlMetrics (used by parallel workers)"""
+        self.phases = other.phases
+        self.products = other.products
+        self.counters = other.counters
+        self._lock = other._lock
+        self._start = other._start
+        self.started = other.started
+
+    def _product_entry(self, product):
+        return self.products.setdefault(product, {'seconds': 0.0, 'phases': {}, 'counters': {}})
+
+    def record(self, phase, seconds, product=None):
+        product = product if product is not None else getattr(self._local, 'product', None)
+        with self._lock:
+            _add(self.phases.setdefault(phase, _new_entry()), seconds)
+            if product is not None:
+                _add(self._product_entry(product)['phases'].setdefault(phase, _new_entry()), seconds)
+
+    @contextmanager
+    def span(self, phase, product=None):
+        """Time a block. Without product, it counts towards the thread's current product"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start, product)
+
+    @contextmanager
+    def product(self, product, bind=True):
+        """Time a whole product. bind=True makes it the current product of this thread
+        (async code passes product= to each span instead)"""
+        previous = getattr(self._local, 'product', None)
+        if bind:
+            self._local.product = product
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self._product_entry(product)['seconds'] += seconds
+            if bind:
+                self._local.product = previous
+
+    def count(self, name, n=1, product=None):
+        product = product if product is not None else getattr(self._local, 'product', None)
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            if product is not None:
+                counters = self._product_entry(product)['counters']
+                counters[name] = counters.get(name, 0) + n
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'crawler': self.crawler,
+                'started': self.started.isoformat(timespec='seconds'),
+                'elapsed_s': round(self.elapsed, 3),
+                'counters': dict(self.counters),
+                'phases': {name: dict(entry) for name, entry in self.phases.items()},
+                'products': {product: {'seconds': round(entry['seconds'], 3),
+                                       'counters': dict(entry['counters']),
+                                       'phases': {name: dict(p) for name, p in entry['phases'].items()}}
+                             for product, entry in self.products.items()}
+            }
+
+    def write_json(self, path):
+        write_json_atomic(path, self.to_dict())
+        print(f"💾 Saved crawl metrics: {path}")
+
+    def write_prometheus(self, path):
+        """node_exporter textfile collector format"""
+        data = self.to_dict()
+        crawler = _label(self.crawler)
+        lines = [
+            '# HELP decathlon_crawl_run_seconds Wall time of the crawl run.',
+            '# TYPE decathlon_crawl_run_seconds gauge',
+            f'decathlon_crawl_run_seconds{{crawler="{crawler}"}} {data["elapsed_s"]}',
+            '# HELP decathlon_crawl_last_run_timestamp_seconds When the crawl run started.',
+            '# TYPE decathlon_crawl_last_run_timestamp_seconds gauge',
+            f'decathlon_crawl_last_run_timestamp_seconds{{crawler="{crawler}"}} {self.started.timestamp():.0f}',
+            '# HELP decathlon_crawl_items_total Items processed during the run.',
+            '# TYPE decathlon_crawl_items_total counter'
+        ]
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f'decathlon_crawl_items_total{{crawler="{crawler}",item="{_label(name)}"}} {value}')
+
+        lines += ['# HELP decathlon_crawl_phase_seconds_total Time spent in each phase.',
+                  '# TYPE decathlon_crawl_phase_seconds_total counter']
+        for name, entry in sorted(data['phases'].items()):
+            lines.append(f'decathlon_crawl_phase_seconds_total{{crawler="{crawler}",phase="{_label(name)}"}} '
+                         f'{entry["total"]:.6f}')
+        lines += ['# HELP decathlon_crawl_phase_calls_total Number of times each phase ran.',
+                  '# TYPE decathlon_crawl_phase_calls_total counter']
+        for name, entry in sorted(data['phases'].items()):
+            lines.append(f'decathlon_crawl_phase_calls_total{{crawler="{crawler}",phase="{_label(name)}"}} '
+                         f'{entry["count"]}')
+        lines += ['# HELP decathlon_crawl_phase_max_seconds Slowest single run of each phase.',
+                  '# TYPE decathlon_crawl_phase_max_seconds gauge']
+        for name, entry in sorted(data['phases'].items()):
+            lines.append(f'decathlon_crawl_phase_max_seconds{{crawler="{crawler}",phase="{_label(name)}"}} '
+                         f'{entry["max"]:.6f}')
+
+        lines += ['# HELP decathlon_crawl_product_seconds Wall time per product.',
+                  '# TYPE decathlon_crawl_product_seconds gauge']
+        for product, entry in sorted(data['products'].items()):
+            lines.append(f'decathlon_crawl_product_seconds{{crawler="{crawler}",product="{_label(product)}"}} '
+                         f'{entry["seconds"]}')
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)  # The collector must never read a half-written file
+        print(f"💾 Saved Prometheus metrics: {path}")
+
+    def report(self, slowest=5):
+        """Print where the time went"""
+        data = self.to_dict()
+        if not data['phases']:
+            return
+        busy = sum(entry['total'] for entry in data['phases'].values()) or 1.0
+        print(f"\n⏱️ Phase times ({self.crawler}, run {data['elapsed_s']:.1f}s):")
+        for name, entry in sorted(data['phases'].items(), key=lambda item: -item[1]['total']):
+            avg = entry['total'] / entry['count'] if entry['count'] else 0.0
+            print(f"  {name:<18} {entry['total']:>8.1f}s {entry['total'] / busy * 100:>5.1f}%  "
+                  f"{entry['count']}x, avg {avg:.2f}s, max {entry['max']:.2f}s")
+        if data['counters']:
+            print("  " + ", ".join(f"{name}: {value}" for name, value in sorted(data['counters'].items())))
+
+        products = sorted(data['products'].items(), key=lambda item: -item[1]['seconds'])[:slowest]
+        if products and products[0][1]['seconds']:
+            print(f"\n🐢 Slowest products:")
+            for product, entry in products:
+                top = max(entry['phases'].items(), key=lambda item: item[1]['total'], default=None)
+                top_text = f" (mostly {top[0]}: {top[1]['total']:.1f}s)" if top else ""
+                print(f"  {entry['seconds']:>7.1f}s  {product}{top_text}")
@@ -0,0 +1,247 @@
+"""
+Persistent crawl state shared between runs
+
+CrawlStateStore keeps a per-product high-water mark (newest review date and
+hashes seen, last review count) so a re-run can stop paginating at the first
+review it already collected. CrawlCheckpoint records a single run's progress
+so an interrupted run can be resumed. ReviewDedupIndex rejects a review that
+was already written in this run, and dedupe_product_urls keeps one URL per
+product id.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+
+def review_hash(review_data):
+    """Stable identity of a review: product, date and (truncated) text"""
+    key = '|'.join([
+        str(review_data.get('product_id', '')),
+        str(review_data.get('date', '')),
+        str(review_data.get('review_text', ''))[:200]
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def product_id_from_url(url):
+    """Trailing product number of a product URL (.../...-kiprun-8915926.html -> 8915926)"""
+    path = urlsplit(url).path
+    return path.split('-')[-1].split('.')[0]
+
+
+def dedupe_product_urls(urls):
+    """Keep the first URL of each product id; the same product is listed under several slugs"""
+    seen = set()
+    unique = []
+    for url in urls:
+        product_id = product_id_from_url(url)
+        if product_id in seen:
+            continue
+        seen.add(product_id)
+        unique.append(url)
+    if len(unique) < len(urls):
+        print(f"🔗 {len(urls) - len(unique)} duplicate product URLs dropped ({len(unique)} products)")
+    return unique
+
+
+def write_json_atomic(path, data):
+    """Write JSON so a crash never leaves a half-written file behind"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def detect_delimiter(filename):
+    """complete.csv/summary.csv have been written both comma- and tab-separated"""
+    with open(filename, encoding='utf-8-sig') as f:
+        header = f.readline()
+    return '\t' if '\t' in header else ','
+
+
+class CrawlStateStore:
+    """Newest review seen per product_id, persisted as JSON"""
+
+    def __init__(self, path='data/crawl_state.json'):
+        self.path = path
+        self.products = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.products = json.load(f).get('products', {})
+
+    def is_empty(self):
+        return not self.products
+
+    def is_known(self, review_data):
+        """True if this review was collected by a previous run.
+        Reviews are listed newest first, so anything older than the newest
+        known date - or on that date and already hashed - was seen before."""
+        state = self.products.get(str(review_data['product_id']))
+        if not state or not state.get('newest_date'):
+            return False
+        date = review_data.get('date')
+        if not date or date == 'Unknown':
+            return review_hash(review_data) in state['boundary_hashes']
+        if date < state['newest_date']:
+            return True
+        return date == state['newest_date'] and review_hash(review_data) in state['boundary_hashes']
+
+    def review_count(self, product_id):
+        return self.products.get(str(product_id), {}).get('review_count', 0)
+
+    def update(self, product_id, new_reviews):
+        """Advance the high-water mark with the reviews collected this run"""
+        product_id = str(product_id)
+        state = self.products.setdefault(product_id, {
+            'newest_date': None, 'newest_hash': None, 'boundary_hashes': [], 'review_count': 0
+        })
+        for review_data in new_reviews:
+            date = review_data.get('date')
+            if not date or date == 'Unknown':
+                continue
+            digest = review_hash(review_data)
+            if state['newest_date'] is None or date > state['newest_date']:
+                state['newest_date'] = date
+                state['newest_hash'] = digest
+                state['boundary_hashes'] = [digest]
+            elif date == state['newest_date'] and digest not in state['boundary_hashes']:
+                state['boundary_hashes'].append(digest)
+        state['review_count'] += len(new_reviews)
+        state['last_crawled'] = datetime.now().isoformat(timespec='seconds')
+
+    def seed_from_csv(self, filename):
+        """Build the state from an existing complete.csv (first incremental run)"""
+        if not os.path.exists(filename):
+            return 0
+        by_product = {}
+        with open(filename, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f, delimiter=detect_delimiter(filename)):
+                by_product.setdefault(row['product_id'], []).append(row)
+        for product_id, rows in by_product.items():
+            self.update(product_id, rows)
+        print(f"📚 Seeded crawl state with {len(by_product)} products from {filename}")
+        return len(by_product)
+
+    def save(self):
+        write_json_atomic(self.path, {'products': self.products})
+
+
+class CrawlCheckpoint:
+    """Append-only, fsynced log of a run's progress so it can be resumed.
+
+    Each line is one event for a product URL:
+      {"event": "start", "url": ..., "summary": {...}}    product page opened
+      {"event": "page", "url": ..., "page": n, "rows": [...]}    page n done
+      {"event": "done", "url": ..., "summary": {...}}     product finished
+    Replaying the log gives the finished products and, for an interrupted
+    product, the last page reached and the rows collected so far."""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.products = {}
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self._replay()
+        elif os.path.exists(path):
+            os.remove(path)  # Fresh run
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _replay(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line from a crash
+                product = self.products.setdefault(
+                    event['url'], {'summary': None, 'rows': [], 'page': 0, 'done': False})
+                if event['event'] == 'start':
+                    product.update(summary=event['summary'], rows=[], page=0, done=False)
+                elif event['event'] == 'page':
+                    product['rows'].extend(event['rows'])
+                    product['page'] = event['page']
+                elif event['event'] == 'done':
+                    product['summary'] = event.get('summary') or product['summary']
+                    product['done'] = True
+        done = sum(1 for p in self.products.values() if p['done'])
+        print(f"♻️ Resuming: {done} finished products, "
+              f"{len(self.products) - done} in progress ({self.path})")
+
+    def _append(self, event):
+        with self._lock:
+            self._file.write(json.dumps(event, ensure_ascii=False) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def is_done(self, url):
+        return self.products.get(url, {}).get('done', False)
+
+    def get(self, url):
+        return self.products.get(url)
+
+    def completed(self):
+        return [(url, p) for url, p in self.products.items() if p['done']]
+
+    def start_product(self, url, summary):
+        self._append({'event': 'start', 'url': url, 'summary': summary})
+
+    def page_done(self, url, page_number, rows):
+        self._append({'event': 'page', 'url': url, 'page': page_number, 'rows': rows})
+
+    def product_done(self, url, summary=None):
+        self._append({'event': 'done', 'url': url, 'summary': summary})
+
+    def close(self):
+        self._file.close()
+
+
+class ReviewDedupIndex:
+    """Reviews already written this run, keyed by product_id + date + content hash.
+    add() is O(1), so every row can be checked as it streams in. Keys are kept per product and
+    dropped by finish(), so memory follows the products in progress, not the whole catalogue"""
+
+    def __init__(self):
+        self.products = {}  # product_id -> keys of its reviews written so far
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(review_data):
+        return f"{review_data.get('product_id', '')}|{review_data.get('date', '')}|{review_hash(review_data)}"
+
+    def add(self, review_data):
+        """Remember a review. Returns False if it was seen before"""
+        key = self.key(review_data)
+        with self._lock:
+            keys = self.products.setdefault(str(review_data.get('product_id', '')), set())
+            if key in keys:
+                self.duplicates += 1
+                return False
+            keys.add(key)
+            return True
+
+    def add_all(self, rows):
+        with self._lock:
+            for review_data in rows:
+                self.products.setdefault(str(review_data.get('product_id', '')), set()).add(self.key(review_data))
+
+    def finish(self, product_id):
+        """Forget a finished product's keys"""
+        with self._lock:
+            self.products.pop(str(product_id), None)
+
+    def __len__(self):
+        return sum(len(keys) for keys in self.products.values())
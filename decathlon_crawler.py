@@ -2,35 +2,215 @@
 Decathlon Korea Review Scraper - FIXED VERSION
 """
 
+import argparse
 import time
 import csv
 import re
+import os
+import queue
+import threading
 from datetime import datetime, timedelta
 from urllib.parse import unquote
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.action_chains import ActionChains
+from page_waits import PageWaiter, REVIEW_XPATH
+from browser import create_driver, DriverWatchdog, TabPool, TrafficMeter
+from crawl_metrics import CrawlMetrics
+from http_fetcher import HttpReviewFetcher, HttpFetchError, review_page_url, cutoff_search
+from async_crawler import AsyncCrawlEngine
+from crawl_state import (CrawlStateStore, CrawlCheckpoint, ReviewDedupIndex, detect_delimiter,
+                         dedupe_product_urls, product_id_from_url)
+from review_sinks import MemorySink, REVIEW_FIELDS
+from page_cache import CachedPageFetcher
+from politeness import paced
+from sentiment import classify_sentiment
+from summary_aggregates import merge_partial, save_partials, summary_record
+from work_queue import LeaseLost
+from parquet_output import write_reviews_dataset, write_summary_parquet, read_summary_parquet
+
+PRICE_SELECTORS = [
+    '[data-testid*="price"]',
+    '.product-price',
+    '[class*="price"]',
+    'span[class*="Price"]',
+    'div[class*="price"]'
+]
+
+# Finds every review container on the page and returns [{dateLine, date, rating, ratingSource, text}]
+# in a single WebDriver round trip. Mirrors the old per-element logic: climb ancestors 2..7 until
+# the text is long enough, then try the rating span, a lone "4.8"-style span, stars, and data attributes.
+EXTRACT_REVIEWS_JS = r"""
+var snapshot = document.evaluate(arguments[0], document, null,
+                                 XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var reviews = [];
+for (var i = 0; i < snapshot.snapshotLength; i++) {
+    var node = snapshot.snapshotItem(i);
+    var review = {dateLine: (node.innerText || node.textContent || '').trim(),
+                  date: null, rating: null, ratingSource: null, text: null};
+
+    var container = null;
+    var el = node.parentElement;
+    for (var level = 2; level <= 7 && el; level++) {
+        el = el.parentElement;
+        if (!el) break;
+        var t = el.innerText || '';
+        if (t.length > 30 && t.indexOf('대한민국') !== -1) { container = el; break; }
+    }
+    if (!container) { reviews.push(review); continue; }
+
+    var fullText = container.innerText || '';
+    review.text = fullText;
+    var dateMatch = fullText.match(/대한민국\s*\|\s*(\d{2}\/\d{2}\/\d{4})/);
+    if (dateMatch) review.date = dateMatch[0];
+
+    var ratingSpan = container.querySelector('span[class*="18wdkpi"]');
+    var ratingText = ratingSpan ? (ratingSpan.innerText || '').trim() : '';
+    if (ratingText && !isNaN(parseFloat(ratingText))) {
+        review.rating = parseFloat(ratingText); review.ratingSource = 'span';
+    }
+    if (review.rating === null) {
+        var spans = container.getElementsByTagName('span');
+        for (var j = 0; j < spans.length; j++) {
+            var s = (spans[j].innerText || '').trim();
+            if (/^([0-5])(\.\d)?$/.test(s)) { review.rating = parseFloat(s); review.ratingSource = 'span'; break; }
+        }
+    }
+    if (review.rating === null) {
+        var stars = (fullText.match(/★/g) || []).length;
+        if (stars >= 1 && stars <= 5) { review.rating = stars; review.ratingSource = 'stars'; }
+    }
+    if (review.rating === null) {
+        var html = container.outerHTML;
+        var m = html.match(/data-rating["\s:=]+([0-5]\.?\d*)/i) || html.match(/"rating"\s*:\s*([0-5]\.?\d*)/i);
+        if (m && parseFloat(m[1]) <= 5) { review.rating = parseFloat(m[1]); review.ratingSource = 'html'; }
+    }
+    reviews.push(review);
+}
+return reviews;
+"""
+
+# Clicks the numbered paginator button of page arguments[0]; false when it is not rendered
+CLICK_PAGE_BUTTON_JS = r"""
+var target = String(arguments[0]);
+var candidates = document.querySelectorAll('button, a');
+for (var i = 0; i < candidates.length; i++) {
+    var el = candidates[i];
+    if (!el.closest('nav, [class*="pagination"], [class*="Pagination"], [data-testid*="pagination"]')) continue;
+    var text = (el.innerText || el.textContent || '').trim();
+    var label = el.getAttribute('aria-label') || '';
+    if (text !== target && label !== 'Page ' + target && label !== target + ' 페이지') continue;
+    if (el.disabled || el.getAttribute('aria-disabled') === 'true') continue;
+    el.scrollIntoView({block: 'center'});
+    el.click();
+    return true;
+}
+return false;
+"""
 
 class DecathlonReviewScraper:
-    def __init__(self, headless=False, max_pages=40):
-        self.options = Options()
-        if headless:
-            self.options.add_argument('--headless')
-        self.options.add_argument('--start-maximized')
-        self.options.add_argument('--disable-blink-features=AutomationControlled')
-        self.options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        self.driver = webdriver.Chrome(options=self.options)
-        self.wait = WebDriverWait(self.driver, 15)
+    def __init__(self, headless=False, max_pages=40, workers=1, backend='selenium', http_fallback=True,
+                 per_host=8, state_path=None, checkpoint_path=None, resume=False, sink=None,
+                 snapshot_cache=None, lean=False, pagination='sequential', work_queue=None, driver=None,
+                 tabs=False, watchdog=None, politeness=None):
+        self.headless = headless
+        self.lean = lean  # Block images/media/fonts/trackers and load pages eagerly
+        
+        # 'selenium' renders every page in Chrome, 'http' fetches and parses pages without a browser,
+        # 'async' does the same as 'http' but keeps many requests in flight with asyncio,
+        # 'replay' re-extracts pages saved in snapshot_cache with no network or browser
+        self.backend = backend
+        self.http_fallback = http_fallback and backend != 'replay'  # Use the browser when the HTTP fetch fails
+        self.snapshot_cache = snapshot_cache  # Optional PageSnapshotCache: every review page is saved there
+        # Optional PolitenessScheduler: paces every page load and request per host (replaces product_delay)
+        self.politeness = politeness
+        self.driver = None
+        self.waiter = PageWaiter(None, timeout=15)
+        self.traffic = TrafficMeter(None)  # Bytes and load times of browser page loads
+        self.metrics = CrawlMetrics('reviews')  # Per-phase timing spans, per product and per run
+        self.http = None
+        if backend == 'http':
+            self.http = HttpReviewFetcher(cache=snapshot_cache, politeness=politeness)
+        elif backend == 'replay':
+            self.http = CachedPageFetcher(snapshot_cache)
+        self.owns_driver = driver is None  # A driver passed in (unified pipeline) is quit by its owner
+        # Optional DriverWatchdog: restarts our Chrome after N pages, above a memory limit or on a hang
+        self.watchdog = watchdog
+        # tabs=True: parallel workers are tabs of one Chrome (TabPool) instead of one Chrome each
+        self.tab_pool = None
+        if driver is not None:
+            self.use_driver(driver)
+        elif backend == 'selenium' and tabs and workers > 1:
+            self.tab_pool = TabPool(headless, lean, max_tabs=workers)
+            self.use_driver(self.tab_pool.acquire())
+        elif backend == 'selenium':
+            self.start_driver()
+        if not self.owns_driver or self.tab_pool is not None:
+            self.watchdog = None  # Not ours to restart: other crawlers or tabs use the same Chrome
         
         self.six_months_ago = datetime.now() - timedelta(days=180)
         self.max_pages = max_pages  # Maximum pages to scrape per product
+        self.workers = max(1, workers)  # Parallel browser sessions (requests in flight for 'async')
+        self.per_host = per_host  # Requests in flight per host for 'async'
+        # 'sequential' clicks through pages until one is older than 6 months, 'direct' jumps to pages
+        # and binary-searches the last page inside the window first
+        self.pagination = pagination
+        self.page_urls = True  # False once the current product turned out to ignore ?page=N
+        self.first_page_signature = ''  # Reviews shown on the current product's page 1
+        self.product_delay = 3  # Seconds between products without politeness (0 for local fixtures/benchmarks)
         self.all_reviews = []
-        self.product_summaries = {}
+        self.product_summaries = {}  # Running per-product aggregates only
+        # Where parsed review rows go, page by page (default: kept in all_reviews)
+        self.sink = sink if sink is not None else MemorySink(self.all_reviews)
+        self.lock = threading.Lock()  # Guards all_reviews/product_summaries across workers
+        # Incremental mode: stop at reviews already collected by a previous run
+        self.state = CrawlStateStore(state_path) if state_path else None
+        # Durable per-product/per-page progress; resume=True continues an interrupted run
+        self.checkpoint = CrawlCheckpoint(checkpoint_path, resume) if checkpoint_path else None
+        # Reviews written this run; re-visited or overlapping pages never produce duplicate rows
+        self.dedup = ReviewDedupIndex()
+        # Optional shared WorkQueue: products are leased from it and committed to it, so several
+        # processes or machines can run the same crawl
+        self.work_queue = work_queue
         
+    def start_driver(self):
+        """Start Chrome (lazily for the HTTP backend, only when falling back)"""
+        self.use_driver(create_driver(self.headless, self.lean))
+        if self.watchdog is not None:
+            self.watchdog.attach(self.driver)
+    
+    def restart_driver(self, reason, url=None, page_number=1):
+        """Replace Chrome with a fresh one and reopen url at review page page_number"""
+        print(f"   🔄 Restarting Chrome ({reason}, {self.watchdog.pages} pages on this session)")
+        with self.metrics.span('driver_restart'):
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"   ⚠️ Old browser did not quit cleanly: {e}")
+            self.watchdog.restarted(reason)
+            self.metrics.count('driver_restarts')
+            self.start_driver()
+            if url is None:
+                return
+            self.open_product_page(url)
+            if not self.reach_review_page(url, page_number):
+                # Carrying on would re-crawl the product from page 1 under page N's number
+                raise RuntimeError(f"could not get back to review page {page_number} after the restart")
+    
+    def check_driver(self, url=None, page_number=1):
+        """Restart Chrome when the watchdog says so (page count or memory)"""
+        reason = self.watchdog.check() if self.watchdog is not None else None
+        if reason:
+            self.restart_driver(reason, url, page_number)
+    
+    def use_driver(self, driver):
+        self.driver = driver
+        self.wait = WebDriverWait(self.driver, 15)
+        self.waiter.driver = self.driver
+        self.traffic.driver = self.driver
+    
     def classify_subcategory(self, product_name):
         name_lower = product_name.lower()
         if any(w in name_lower for w in ['재킷', 'jacket', '셔츠', '티', '쇼츠', '베스트', '싱글렛', '레깅스']):
@@ -46,7 +226,7 @@ class DecathlonReviewScraper:
     
     def extract_product_info_from_url(self, url):
         try:
-            product_id = url.split('-')[-1].split('.')[0]
+            product_id = product_id_from_url(url)
             url_parts = url.split('_')
             if len(url_parts) > 1:
                 encoded_name = url_parts[1].split('-')[0:-4]
@@ -87,88 +267,28 @@ class DecathlonReviewScraper:
             return None
     
     def classify_sentiment(self, review_text, rating):
-        negative_words = ['별로', '실망', '안좋', '나쁘', '최악', '환불', '불만']
-        positive_words = ['좋', '만족', '추천', '최고', '훌륭', '완벽']
-        
-        if rating >= 4.5:
-            return 'positive'
-        elif rating <= 2.5:
-            return 'negative'
-        else:
-            has_negative = any(word in review_text for word in negative_words)
-            has_positive = any(word in review_text for word in positive_words)
-            if has_negative and has_positive:
-                return 'mixed'
-            elif has_negative:
-                return 'negative'
-            else:
-                return 'mixed'
+        return classify_sentiment(review_text, rating)
     
-    def extract_rating_fixed(self, review_element):
-        """FIXED: Extract rating from the specific span element"""
-        try:
-            # Method 1: Look for span with class containing "18wdkpi" (from your screenshot)
-            try:
-                rating_span = review_element.find_element(By.CSS_SELECTOR, 'span[class*="18wdkpi"]')
-                rating_text = rating_span.text.strip()
-                if rating_text:
-                    rating = float(rating_text)
-                    print(f"    ✅ Found rating: {rating}★")
-                    return rating
-            except:
-                pass
-            
-            # Method 2: Look for any span that contains a decimal number pattern like "4.8"
-            spans = review_element.find_elements(By.TAG_NAME, 'span')
-            for span in spans:
-                text = span.text.strip()
-                # Match pattern like "4.8" or "5.0" or "3"
-                match = re.match(r'^([0-5])(\.\d)?$', text)
-                if match:
-                    rating = float(text)
-                    print(f"    ✅ Found rating: {rating}★")
-                    return rating
-            
-            # Method 3: Count star symbols in the entire review text
-            review_text = review_element.text
-            filled_stars = review_text.count('★')
-            if 1 <= filled_stars <= 5:
-                print(f"    ✅ Found {filled_stars} filled stars")
-                return float(filled_stars)
-            
-            # Method 4: Search in HTML for data attributes
-            html = review_element.get_attribute('outerHTML')
-            rating_patterns = [
-                r'data-rating["\s:=]+([0-5]\.?\d*)',
-                r'"rating"\s*:\s*([0-5]\.?\d*)',
-            ]
-            
-            for pattern in rating_patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                if matches:
-                    rating = float(matches[0])
-                    if 0 <= rating <= 5:
-                        print(f"    ✅ Found rating in HTML: {rating}")
-                        return rating
-            
-            print(f"    ⚠️ Could not find rating, defaulting to 5.0")
-            return 5.0
-            
-        except Exception as e:
-            print(f"    ❌ Error extracting rating: {e}")
-            return 5.0
+    def extract_page_reviews(self):
+        """Collect all reviews on the current page with one execute_script call"""
+        return self.driver.execute_script(EXTRACT_REVIEWS_JS, REVIEW_XPATH) or []
+    
+    def resolve_rating(self, raw_review):
+        """Rating found in the page, or 5.0 when none of the methods matched"""
+        rating = raw_review.get('rating')
+        if rating is not None and 0 <= float(rating) <= 5:
+            rating = float(rating)
+            if raw_review.get('ratingSource') == 'stars':
+                print(f"    ✅ Found {int(rating)} filled stars")
+            else:
+                print(f"    ✅ Found rating: {rating}★")
+            return rating
+        print(f"    ⚠️ Could not find rating, defaulting to 5.0")
+        return 5.0
     
     def get_product_price(self):
         try:
-            selectors = [
-                '[data-testid*="price"]',
-                '.product-price',
-                '[class*="price"]',
-                'span[class*="Price"]',
-                'div[class*="price"]'
-            ]
-            
-            for selector in selectors:
+            for selector in PRICE_SELECTORS:
                 try:
                     price_elem = self.driver.find_element(By.CSS_SELECTOR, selector)
                     price_text = price_elem.text
@@ -231,12 +351,19 @@ class DecathlonReviewScraper:
             print(f"  ⚠️ Error getting thumbnail: {e}")
             return None
     
+    def wait_for_product_page(self):
+        """Wait until the product title/price is rendered instead of sleeping"""
+        self.waiter.page_ready()
+        self.waiter.any_element('product_ready', ['h1'] + PRICE_SELECTORS)
+    
     def scroll_and_wait(self):
         print("Scrolling to reviews section...")
         for i in range(5):
             self.driver.execute_script("window.scrollBy(0, 500);")
-            time.sleep(1)
-        time.sleep(3)
+        # Reviews are lazy-loaded once scrolled into view
+        if not self.waiter.reviews_present(timeout=10):
+            print("   ⚠️ Reviews did not appear within 10s")
+        self.waiter.dom_quiet(quiet_ms=500, timeout=5)
     
     def should_continue_scraping(self, date_str):
         """Check if we should continue scraping based on date (6 months cutoff)"""
@@ -254,12 +381,11 @@ class DecathlonReviewScraper:
         try:
             print(f"    🔄 Looking for next page button...")
             
-            # Wait a bit for page to settle
-            time.sleep(2)
+            # Remember the current reviews so we can tell when the next page has rendered
+            old_signature = self.waiter.review_signature()
             
             # Scroll to bottom to ensure pagination is visible
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
             
             # Try multiple strategies to find and click next button
             next_button_strategies = [
@@ -300,7 +426,6 @@ class DecathlonReviewScraper:
                             
                             # Scroll button into view
                             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                            time.sleep(1)
                             
                             # Try regular click first
                             try:
@@ -309,10 +434,11 @@ class DecathlonReviewScraper:
                                 # If regular click fails, try JavaScript click
                                 self.driver.execute_script("arguments[0].click();", button)
                             
-                            # Wait for page to load
-                            time.sleep(4)
+                            # Wait until the review list has actually changed
+                            if not self.waiter.reviews_changed(old_signature, timeout=10):
+                                print(f"    ⚠️ Reviews did not change within 10s")
+                            self.traffic.record()
                             
-                            # Verify we moved to next page by checking if URL changed or content updated
                             print(f"    ✅ Successfully clicked next page")
                             return True
                             
@@ -330,27 +456,9 @@ class DecathlonReviewScraper:
             print(f"    ❌ Error in pagination: {e}")
             return False
     
-    def extract_reviews_from_product(self, url):
-        print(f"\n{'='*70}")
-        print(f"Scraping: {url}")
-        print(f"{'='*70}")
-        
-        product_info = self.extract_product_info_from_url(url)
-        if not product_info:
-            print("✗ Failed to extract product info")
-            return
-        
-        self.driver.get(url)
-        time.sleep(5)
-        
-        price = self.get_product_price()
-        thumbnail = self.get_product_thumbnail()
-        
-        self.scroll_and_wait()
-        
-        product_id = product_info['product_id']
-        self.product_summaries[product_id] = {
-            'product_id': product_id,
+    def new_summary(self, product_info, price, thumbnail):
+        return {
+            'product_id': product_info['product_id'],
             'product_name': product_info['product_name'],
             'category': product_info['category'],
             'subcategory': product_info['subcategory'],
@@ -361,110 +469,330 @@ class DecathlonReviewScraper:
             'mixed_reviews': 0,
             'negative_reviews': 0,
             'ratings_sum': 0,
-            'url': url,
-            'thumbnail_url': thumbnail
+            'url': product_info['url'],
+            'thumbnail_url': thumbnail,
+            'first_date': None,
+            'last_date': None
+        }
+    
+    def add_to_summary(self, summary, review_data):
+        summary['total_reviews'] += 1
+        summary['ratings_sum'] += review_data['rating']
+        summary[f"{review_data['sentiment']}_reviews"] += 1
+        if review_data['date'] != 'Unknown':
+            summary['first_date'] = min(summary['first_date'] or review_data['date'], review_data['date'])
+            summary['last_date'] = max(summary['last_date'] or review_data['date'], review_data['date'])
+    
+    def build_review(self, raw_review, product_info, idx=None):
+        """Turn one raw {date, rating, text} page review into a review_data dict.
+        Returns (review_data, is_old); review_data is None when the review is skipped"""
+        full_text = raw_review.get('text')
+        if not full_text:
+            return None, False
+        
+        # Extract date
+        date_str = raw_review.get('date')
+        if date_str:
+            review_date = self.parse_korean_date(date_str)
+            formatted_date = review_date.strftime('%Y-%m-%d') if review_date else date_str
+            
+            # Check if review is within 6 months
+            if not self.should_continue_scraping(date_str):
+                print(f"   ⏹️ Review {idx} is older than 6 months: {formatted_date}")
+                return None, True
+        else:
+            formatted_date = "Unknown"
+        
+        rating = self.resolve_rating(raw_review)
+        
+        # Extract review text
+        lines = full_text.split('\n')
+        review_lines = [line.strip() for line in lines if line.strip() and '대한민국' not in line and len(line) > 5]
+        
+        if review_lines:
+            review_text = ' '.join(review_lines)
+        else:
+            review_text = "No text content"
+        
+        if len(review_text) < 5:
+            return None, False
+        
+        sentiment = self.classify_sentiment(review_text, rating)
+        
+        review_data = {
+            'product_id': product_info['product_id'],
+            'product_name': product_info['product_name'],
+            'category': product_info['category'],
+            'subcategory': product_info['subcategory'],
+            'brand': product_info['brand'],
+            'rating': rating,
+            'review_text': review_text[:200],
+            'sentiment': sentiment,
+            'date': formatted_date
         }
+        return review_data, False
+    
+    def page_is_all_old(self, raw_reviews):
+        """True when every review on the page is older than 6 months"""
+        recent_count = sum(1 for raw_review in raw_reviews
+                           if self.should_continue_scraping(raw_review.get('dateLine') or ''))
+        return recent_count == 0
+    
+    def skip_to_page(self, target_page, use_http):
+        """Move from page 1 to target_page without extracting. Returns the page reached"""
+        if use_http:
+            return target_page if self.http.goto_page(target_page) else 1
+        page_number = 1
+        while page_number < target_page:
+            with paced(self.politeness, self.driver.current_url, browser=True):
+                if not self.click_next_page_fixed():
+                    break
+            page_number += 1
+        return page_number
+    
+    def open_product_page(self, url):
+        """Load the product (review page 1) in the browser and note which reviews page 1 shows"""
+        with paced(self.politeness, url, browser=True):
+            self.driver.get(url)
+            self.wait_for_product_page()
+        self.scroll_and_wait()
+        self.first_page_signature = self.waiter.review_signature()
+    
+    def goto_review_page_browser(self, url, page_number):
+        """Show review page N: click its numbered paginator button, or load it by URL parameter.
+        Returns False when neither showed page N (a site that ignores ?page=N shows page 1 again)"""
+        old_signature = self.waiter.review_signature()
+        with paced(self.politeness, url, browser=True):
+            if self.driver.execute_script(CLICK_PAGE_BUTTON_JS, page_number):
+                return bool(self.waiter.reviews_changed(old_signature, timeout=10))
+            if not self.page_urls:
+                return False
+            self.driver.get(review_page_url(url, page_number))
+            self.wait_for_product_page()
+        self.scroll_and_wait()
+        signature = self.waiter.review_signature()
+        if page_number > 1 and signature and signature in (old_signature, self.first_page_signature):
+            print(f"   ⚠️ ?page={page_number} showed the same reviews again: paging by clicks for this product")
+            self.page_urls = False
+            return False
+        return True
+    
+    def reach_review_page(self, url, page_number):
+        """goto_review_page_browser(), or click through from page 1 when the page cannot be addressed.
+        Returns False when page N cannot be reached at all"""
+        if page_number <= 1 or self.goto_review_page_browser(url, page_number):
+            return True
+        print(f"   ↪️ Clicking through to page {page_number}")
+        self.open_product_page(url)
+        return self.skip_to_page(page_number, False) == page_number
+    
+    def load_review_page(self, url, page_number, use_http):
+        """Jump straight to review page N and return its raw reviews ([] when there is none)"""
+        if use_http:
+            return self.http.current_reviews() if self.http.goto_page(page_number) else []
+        if not self.goto_review_page_browser(url, page_number):
+            return []
+        self.traffic.record()
+        raw_reviews = self.extract_page_reviews()
+        if self.snapshot_cache is not None:
+            self.snapshot_cache.put('reviews', url, page_number, self.driver.page_source)
+        return raw_reviews
+    
+    def find_cutoff_page(self, probe, first_reviews):
+        """Last review page with a review inside the 6-month window (see cutoff_search).
+        Returns (last_page, {page_number: raw_reviews}) so probed pages are not loaded twice"""
+        probed = {1: first_reviews}
+        search = cutoff_search(self.max_pages)
+        try:
+            page_number = next(search)
+            while True:
+                if page_number not in probed:
+                    probed[page_number] = probe(page_number)
+                raw_reviews = probed[page_number]
+                page_number = search.send(bool(raw_reviews) and not self.page_is_all_old(raw_reviews))
+        except StopIteration as done:
+            last_page = done.value
+        print(f"   🔎 Last page inside the 6-month window: {last_page} ({len(probed)} pages probed)")
+        return last_page, probed
+    
+    def extract_reviews_from_product(self, url, loaded=False):
+        with self.metrics.product(url):
+            self.scrape_product(url, loaded)
+    
+    def scrape_product(self, url, loaded=False):
+        """Collect one product's reviews page by page (timed by extract_reviews_from_product).
+        loaded=True: the product page is already open in the browser (unified pipeline)"""
+        print(f"\n{'='*70}")
+        print(f"Scraping: {url}")
+        print(f"{'='*70}")
+        
+        product_info = self.extract_product_info_from_url(url)
+        if not product_info:
+            print("✗ Failed to extract product info")
+            return
+        
+        use_http = self.http is not None and not loaded
+        if use_http:
+            try:
+                with self.metrics.span('navigation'):
+                    price, thumbnail = self.http.open_product(url)
+            except HttpFetchError as e:
+                print(f"  ⚠️ HTTP fetch failed: {e}")
+                if not self.http_fallback:
+                    return
+                print("  ↪️ Falling back to the browser")
+                use_http = False
+        
+        if not use_http:
+            if self.driver is None:
+                with self.metrics.span('browser_start'):
+                    self.start_driver()
+            if not loaded:
+                self.check_driver()
+                navigation_start = time.perf_counter()
+                with self.metrics.span('navigation'), paced(self.politeness, url, browser=True):
+                    self.driver.get(url)
+                    self.wait_for_product_page()
+                if self.watchdog is not None:
+                    self.watchdog.record_page(time.perf_counter() - navigation_start)
+            
+            with self.metrics.span('price_thumbnail'):
+                price = self.get_product_price()
+                thumbnail = self.get_product_thumbnail()
+            
+            with self.metrics.span('scroll'):
+                self.scroll_and_wait()
+            self.first_page_signature = self.waiter.review_signature()
+            self.page_urls = True
+            self.traffic.record()
+        
+        # Collected locally and merged once at the end so parallel workers never interleave
+        product_reviews = []
+        summary = self.new_summary(product_info, price, thumbnail)
         
         page_number = 1
         should_continue = True
         reviews_from_product = 0
         
+        direct = self.pagination == 'direct'
+        last_page, probed = self.max_pages, {}
+        if direct:
+            with self.metrics.span('cutoff_search'):
+                first_reviews = self.http.current_reviews() if use_http else self.extract_page_reviews()
+                if self.snapshot_cache is not None and not use_http:
+                    self.snapshot_cache.put('reviews', url, 1, self.driver.page_source)
+                last_page, probed = self.find_cutoff_page(
+                    lambda n: self.load_review_page(url, n, use_http), first_reviews)
+            if not use_http and not self.page_urls:
+                # Probes that came back as page 1 say nothing about the cutoff: page sequentially
+                direct, last_page, probed = False, self.max_pages, {}
+                self.open_product_page(url)
+        
+        partial = self.checkpoint.get(url) if self.checkpoint else None
+        if partial and partial['summary'] and partial['page'] > 0:
+            # Interrupted in the middle of this product - keep its rows and skip the pages already done
+            for review_data in partial['rows']:
+                product_reviews.append(review_data)
+                self.add_to_summary(summary, review_data)
+            self.dedup.add_all(partial['rows'])
+            if not self.sink.keeps_previous:
+                self.sink.write_rows(partial['rows'])
+            reviews_from_product = len(product_reviews)
+            print(f"♻️ Resuming at page {partial['page'] + 1} with {reviews_from_product} reviews from the checkpoint")
+            if direct:
+                page_number = partial['page'] + 1  # Loaded directly by the loop below
+                should_continue = page_number <= last_page
+            else:
+                with self.metrics.span('pagination'):
+                    page_number = self.skip_to_page(partial['page'] + 1, use_http)
+                if page_number <= partial['page']:
+                    should_continue = False  # The last checkpointed page was the last one
+        elif self.checkpoint:
+            self.checkpoint.start_product(url, summary)
+        
+        hang_restarts = 2  # Per product: a hung browser is replaced and the page retried
         while should_continue and page_number <= self.max_pages:  # Added page limit check
             print(f"\n📄 Scraping page {page_number}/{self.max_pages}...")
+            page_written = False
             
             try:
-                # Wait for reviews to load
-                time.sleep(2)
-                
-                # Find review containers
-                all_elements = self.driver.find_elements(By.XPATH, '//*[contains(text(), "대한민국")]')
-                print(f"   Found {len(all_elements)} reviews on this page")
+                if not use_http:
+                    # Direct pagination loads the page itself, so a new browser only reopens the product
+                    self.check_driver(url, 1 if direct else page_number)
+                page_start_time = time.perf_counter()
+                # All review containers of this page in one round trip
+                with self.metrics.span('review_extraction'):
+                    if direct:
+                        raw_reviews = probed.pop(page_number, None)
+                        if raw_reviews is None:
+                            raw_reviews = self.load_review_page(url, page_number, use_http)
+                        if not raw_reviews and not use_http and not self.page_urls:
+                            direct = False  # ?page=N is ignored: click through, then page sequentially
+                            reached = self.reach_review_page(url, page_number)
+                            raw_reviews = self.extract_page_reviews() if reached else []
+                    else:
+                        raw_reviews = self.http.current_reviews() if use_http else self.extract_page_reviews()
+                if self.snapshot_cache is not None and not use_http and not direct:
+                    with self.metrics.span('snapshot'):
+                        self.snapshot_cache.put('reviews', url, page_number, self.driver.page_source)
+                self.metrics.count('pages')
+                print(f"   Found {len(raw_reviews)} reviews on this page")
                 
-                if len(all_elements) == 0:
+                if len(raw_reviews) == 0:
                     print("   ⚠️ No reviews found on this page")
                     break
                 
                 page_has_old_reviews = False
+                reached_known_reviews = False
+                page_start = len(product_reviews)
+                build_start = time.perf_counter()
                 
-                for idx, elem in enumerate(all_elements, 1):
+                for idx, raw_review in enumerate(raw_reviews, 1):
                     try:
-                        # Find review container
-                        review_container = None
-                        for level in range(2, 8):
-                            try:
-                                parent = elem.find_element(By.XPATH, f'./ancestor::*[{level}]')
-                                parent_text = parent.text
-                                if len(parent_text) > 30 and '대한민국' in parent_text:
-                                    review_container = parent
-                                    break
-                            except:
-                                continue
-                        
-                        if not review_container:
+                        review_data, is_old = self.build_review(raw_review, product_info, idx)
+                        if is_old:
+                            page_has_old_reviews = True
+                            continue  # Skip this review but check others on page
+                        if not review_data:
                             continue
                         
-                        full_text = review_container.text
-                        
-                        # Extract date
-                        date_match = re.search(r'대한민국\s*\|\s*(\d{2}/\d{2}/\d{4})', full_text)
-                        if date_match:
-                            date_str = date_match.group(0)
-                            review_date = self.parse_korean_date(date_str)
-                            formatted_date = review_date.strftime('%Y-%m-%d') if review_date else date_str
-                            
-                            # Check if review is within 6 months
-                            if not self.should_continue_scraping(date_str):
-                                print(f"   ⏹️ Review {idx} is older than 6 months: {formatted_date}")
-                                page_has_old_reviews = True
-                                continue  # Skip this review but check others on page
-                        else:
-                            formatted_date = "Unknown"
-                        
-                        # Extract rating - USING FIXED METHOD
-                        rating = self.extract_rating_fixed(review_container)
+                        if self.state and self.state.is_known(review_data):
+                            print(f"   ⏹️ Review {idx} was collected in a previous run. Stopping.")
+                            reached_known_reviews = True
+                            break
                         
-                        # Extract review text
-                        lines = full_text.split('\n')
-                        review_lines = [line.strip() for line in lines if line.strip() and '대한민국' not in line and len(line) > 5]
-                        
-                        if review_lines:
-                            review_text = ' '.join(review_lines)
-                        else:
-                            review_text = "No text content"
-                        
-                        if len(review_text) < 5:
+                        if not self.dedup.add(review_data):
+                            print(f"   ⏭️ Review {idx} is a duplicate. Skipping.")
+                            self.metrics.count('duplicate_reviews')
                             continue
                         
-                        sentiment = self.classify_sentiment(review_text, rating)
-                        
-                        review_data = {
-                            'product_id': product_id,
-                            'product_name': product_info['product_name'],
-                            'category': product_info['category'],
-                            'subcategory': product_info['subcategory'],
-                            'brand': product_info['brand'],
-                            'rating': rating,
-                            'review_text': review_text[:200],
-                            'sentiment': sentiment,
-                            'date': formatted_date
-                        }
-                        
-                        self.all_reviews.append(review_data)
-                        self.product_summaries[product_id]['total_reviews'] += 1
-                        self.product_summaries[product_id]['ratings_sum'] += rating
-                        self.product_summaries[product_id][f'{sentiment}_reviews'] += 1
+                        product_reviews.append(review_data)
+                        self.add_to_summary(summary, review_data)
                         reviews_from_product += 1
                         
-                        print(f"   ✓ Review #{reviews_from_product}: {rating}★ - {formatted_date}")
+                        print(f"   ✓ Review #{reviews_from_product}: {review_data['rating']}★ - {review_data['date']}")
                         
                     except Exception as e:
                         print(f"   ✗ Error on review #{idx}: {e}")
                         continue
                 
+                self.metrics.record('build_reviews', time.perf_counter() - build_start)
+                
+                page_rows = product_reviews[page_start:]
+                self.metrics.count('reviews', len(page_rows))
+                with self.metrics.span('write'):
+                    self.sink.write_rows(page_rows)
+                    if self.checkpoint:
+                        self.sink.flush()  # Rows must be on disk before the page counts as done
+                        self.checkpoint.page_done(url, page_number, page_rows)
+                page_written = True
+                
+                if reached_known_reviews:
+                    break
+                
                 # If this page has old reviews, check if ALL reviews are old
                 if page_has_old_reviews:
-                    recent_count = sum(1 for elem in all_elements if self.should_continue_scraping(elem.text))
-                    if recent_count == 0:
+                    if self.page_is_all_old(raw_reviews):
                         print(f"   ⏹️ All reviews on page {page_number} are older than 6 months. Stopping.")
                         break
                 
@@ -474,17 +802,40 @@ class DecathlonReviewScraper:
                     break
                 
                 # Try to go to next page - USING FIXED METHOD
-                if self.click_next_page_fixed():
+                with self.metrics.span('pagination'):
+                    if direct:
+                        moved = page_number < last_page  # The next page is loaded directly
+                    elif use_http:
+                        moved = self.http.next_page()
+                    else:
+                        with paced(self.politeness, url, browser=True):
+                            moved = self.click_next_page_fixed()
+                if self.watchdog is not None and not use_http:
+                    self.watchdog.record_page(time.perf_counter() - page_start_time)
+                if moved:
                     page_number += 1
-                    time.sleep(3)  # Wait longer for new page to load
                 else:
                     print(f"   ⏹️ No more pages available")
                     break
                 
             except Exception as e:
+                if (not use_http and hang_restarts and self.watchdog is not None
+                        and self.watchdog.is_hang(e)):
+                    hang_restarts -= 1
+                    if page_written:
+                        page_number += 1  # The hang was on the way to the next page
+                    print(f"   ⏳ Browser hung on page {page_number}: {e}")
+                    try:
+                        self.restart_driver('hang', url, 1 if direct else page_number)
+                        continue
+                    except Exception as restart_error:
+                        print(f"   ❌ Could not resume after restarting the browser: {restart_error}")
                 print(f"   ❌ Error on page {page_number}: {e}")
                 break
         
+        with self.metrics.span('write'):
+            self.finish_product(url, summary, product_reviews)
+        
         print(f"\n✅ Extracted {reviews_from_product} reviews from this product (within 6 months)")
         print(f"   Scraped {page_number} page(s)")
     
@@ -493,21 +844,202 @@ class DecathlonReviewScraper:
         print(f"📅 Collecting reviews from: {self.six_months_ago.strftime('%Y-%m-%d')} to today")
         print(f"📄 Maximum {self.max_pages} pages per product\n")
         
+        product_urls = dedupe_product_urls(product_urls)
+        if self.work_queue is not None:
+            self.scrape_from_work_queue(product_urls)  # The queue itself records what is done
+            return
+        
+        if self.checkpoint:
+            product_urls = self.restore_checkpoint(product_urls)
+        
+        if self.backend == 'async':
+            AsyncCrawlEngine(self, concurrency=self.workers, per_host=self.per_host,
+                             politeness=self.politeness).run(product_urls)
+            return
+        
+        if self.workers > 1 and len(product_urls) > 1:
+            self.scrape_with_pool(product_urls)
+            return
+        
         for idx, url in enumerate(product_urls, 1):
             print(f"\n[Product {idx}/{len(product_urls)}]")
             self.extract_reviews_from_product(url)
             
-            if idx < len(product_urls):
-                print("\n⏳ Waiting 3 seconds before next product...")
-                time.sleep(3)
+            if idx < len(product_urls) and self.product_delay and self.politeness is None:
+                print(f"\n⏳ Waiting {self.product_delay} seconds before next product...")
+                time.sleep(self.product_delay)
+    
+    def restore_checkpoint(self, product_urls):
+        """Load finished products from the checkpoint and return the URLs still to do"""
+        for url, product in self.checkpoint.completed():
+            summary = dict(product['summary'])
+            if not self.sink.keeps_previous:
+                self.sink.write_rows(product['rows'])
+            self.merge_product_results(summary, product['rows'], update_state=False)
+        remaining = [url for url in product_urls if not self.checkpoint.is_done(url)]
+        if len(remaining) < len(product_urls):
+            print(f"♻️ Skipping {len(product_urls) - len(remaining)} products finished in the previous run\n")
+        return remaining
+    
+    def finish_product(self, url, summary, product_reviews):
+        """Record a finished product: commit it to the work queue, then merge and checkpoint it"""
+        self.dedup.finish(summary['product_id'])
+        if self.work_queue is not None:
+            try:
+                self.work_queue.complete(url, {'summary': summary, 'rows': product_reviews})
+            except LeaseLost as e:
+                print(f"⚠️ {e}; the worker that took it over commits it instead")
+                return
+        self.merge_product_results(summary, product_reviews)
+        if self.checkpoint:
+            self.checkpoint.product_done(url, summary)
+    
+    def merge_product_results(self, summary, product_reviews, update_state=True):
+        """Merge one product's summary into the shared results (thread-safe).
+        The rows themselves were already written to the sink page by page"""
+        with self.lock:
+            product_id = summary['product_id']
+            existing = self.product_summaries.get(product_id)
+            if existing:
+                # Same product reached twice (e.g. duplicate URL) - accumulate instead of overwrite
+                self.combine_summaries(existing, summary)
+            else:
+                self.product_summaries[product_id] = summary
+            
+            if self.state and update_state:
+                self.state.update(product_id, product_reviews)
+                self.state.save()
+            merged = dict(self.product_summaries[product_id])
+        self.sink.end_product(merged)
+    
+    def combine_summaries(self, existing, summary):
+        """Add summary's counters into existing (newer price/thumbnail win)"""
+        merge_partial(existing, summary)
+    
+    def spawn_worker(self):
+        """Create another scraper with its own browser (or tab) that shares this scraper's results"""
+        tab = self.tab_pool.acquire() if self.tab_pool is not None else None
+        worker = DecathlonReviewScraper(headless=self.headless, max_pages=self.max_pages,
+                                        backend=self.backend, http_fallback=self.http_fallback,
+                                        snapshot_cache=self.snapshot_cache, lean=self.lean,
+                                        pagination=self.pagination, driver=tab,
+                                        watchdog=self.watchdog.for_worker() if self.watchdog else None,
+                                        politeness=self.politeness)
+        worker.owns_driver = True  # Quitting a Tab returns it to the pool
+        worker.six_months_ago = self.six_months_ago
+        worker.product_delay = self.product_delay
+        worker.all_reviews = self.all_reviews
+        worker.product_summaries = self.product_summaries
+        worker.lock = self.lock
+        worker.state = self.state
+        worker.dedup = self.dedup
+        worker.sink = self.sink
+        worker.checkpoint = self.checkpoint
+        worker.work_queue = self.work_queue
+        worker.waiter.share_stats(self.waiter)
+        worker.traffic.share_stats(self.traffic)
+        worker.metrics.share(self.metrics)
+        return worker
+    
+    def scrape_with_pool(self, product_urls):
+        """Scrape products with N browser sessions pulling from a shared queue"""
+        url_queue = queue.Queue()
+        for idx, url in enumerate(product_urls, 1):
+            url_queue.put((idx, url))
+        
+        pool_size = min(self.workers, len(product_urls))
+        print(f"👷 Running {pool_size} browser workers in parallel\n")
+        
+        def run_worker(worker_number):
+            worker = None
+            try:
+                # This scraper's own browser is worker 1, the others start their own
+                worker = self if worker_number == 1 else self.spawn_worker()
+                if self.work_queue is not None:
+                    worker.work_from_leases()
+                else:
+                    worker.work_from_queue(url_queue, len(product_urls))
+            except Exception as e:
+                print(f"❌ Worker {worker_number} failed: {e}")
+            finally:
+                if worker is not None and worker is not self:
+                    worker.close_browser()  # The sink and checkpoint are shared and closed by us
+        
+        threads = [
+            threading.Thread(target=run_worker, args=(n,), name=f"worker-{n}")
+            for n in range(1, pool_size + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    
+    def work_from_queue(self, url_queue, total):
+        """Take products from the queue until it is empty"""
+        while True:
+            try:
+                idx, url = url_queue.get_nowait()
+            except queue.Empty:
+                return
+            
+            print(f"\n[Product {idx}/{total}] ({threading.current_thread().name})")
+            try:
+                self.extract_reviews_from_product(url)
+            except Exception as e:
+                print(f"❌ Error scraping {url}: {e}")
+            
+            if not url_queue.empty() and self.product_delay and self.politeness is None:
+                time.sleep(self.product_delay)
     
-    def save_complete_csv(self, filename='complete.csv'):
+    def scrape_from_work_queue(self, product_urls):
+        """Enqueue product_urls (URLs already queued by another node are skipped) and work
+        on leased products until the shared queue is drained"""
+        added = self.work_queue.enqueue(product_urls)
+        print(f"📥 {added} new product URLs queued in {self.work_queue.path} ({self.work_queue.worker_id})\n")
+        if self.backend == 'async':
+            engine = AsyncCrawlEngine(self, concurrency=self.workers, per_host=self.per_host,
+                                      politeness=self.politeness)
+            for urls in self.work_queue.leases(limit=self.workers):
+                engine.run(urls)
+        elif self.workers > 1 and len(product_urls) > 1:
+            self.scrape_with_pool(product_urls)
+        else:
+            self.work_from_leases()
+        self.work_queue.report()
+    
+    def work_from_leases(self):
+        """Lease products from the shared work queue until it is drained"""
+        for (url,) in self.work_queue.leases():
+            print(f"\n[Leased product] ({threading.current_thread().name})")
+            try:
+                self.extract_reviews_from_product(url)
+            except Exception as e:
+                print(f"❌ Error scraping {url}: {e}")
+                self.work_queue.release(url, str(e))
+            
+            if self.product_delay and self.politeness is None:
+                time.sleep(self.product_delay)
+    
+    def save_complete_csv(self, filename='complete.csv', append=None):
+        if self.sink.persistent:
+            print(f"\n✅ {self.sink.count} reviews were streamed to {self.sink.name}")
+            return
+        
         if not self.all_reviews:
             print("⚠️ No reviews to save")
             return
         
-        fieldnames = ['product_id', 'product_name', 'category', 'subcategory', 'brand', 
-                     'rating', 'review_text', 'sentiment', 'date']
+        fieldnames = REVIEW_FIELDS
+        
+        # Incremental runs only collected new reviews, so add them to the previous file
+        if append is None:
+            append = self.state is not None
+        if append and os.path.exists(filename) and os.path.getsize(filename) > 0:
+            with open(filename, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=detect_delimiter(filename))
+                writer.writerows(self.all_reviews)
+            print(f"\n✅ Appended {len(self.all_reviews)} new reviews to {filename}")
+            return
         
         with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -516,34 +1048,67 @@ class DecathlonReviewScraper:
         
         print(f"\n✅ Saved {len(self.all_reviews)} reviews to {filename}")
     
-    def save_summary_csv(self, filename='summary.csv'):
+    def summary_from_record(self, row):
+        """A summary.csv/summary.parquet row back in product_summaries form"""
+        total = int(row['total_reviews'] or 0)
+        return {
+            'product_id': row['product_id'],
+            'product_name': row['product_name'],
+            'category': row['category'],
+            'subcategory': row['subcategory'],
+            'brand': row['brand'],
+            'price': int(row['price']) if row['price'] else None,
+            'total_reviews': total,
+            'positive_reviews': int(row['positive_reviews'] or 0),
+            'mixed_reviews': int(row['mixed_reviews'] or 0),
+            'negative_reviews': int(row['negative_reviews'] or 0),
+            'ratings_sum': float(row['avg_rating'] or 0) * total,
+            'url': row['url'],
+            'thumbnail_url': row['thumbnail_url'] or None,
+            'first_date': None,
+            'last_date': None
+        }
+    
+    def load_summary_csv(self, filename):
+        """Read a previous summary.csv back into product_summaries form"""
+        summaries = {}
+        with open(filename, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f, delimiter=detect_delimiter(filename)):
+                summaries[row['product_id']] = self.summary_from_record(row)
+        return summaries
+    
+    def merged_summaries(self, filename, load, merge_existing):
+        """This run's summaries, added to the previous totals in filename for incremental runs"""
+        summaries = self.product_summaries
+        if merge_existing is None:
+            merge_existing = self.state is not None
+        if merge_existing and os.path.exists(filename) and os.path.getsize(filename) > 0:
+            summaries = load(filename)
+            for product_id, summary in self.product_summaries.items():
+                if product_id in summaries:
+                    self.combine_summaries(summaries[product_id], summary)
+                else:
+                    summaries[product_id] = dict(summary)
+        return summaries
+    
+    def summary_records(self, summaries):
+        """summary.csv rows (average rating instead of the running sum)"""
+        return [summary_record(summary) for summary in summaries.values()]
+    
+    def save_summary_partials(self, path='summary_partials.json'):
+        """This run's per-product aggregates, to merge with other shards/days (summary_aggregates.py)"""
+        with self.lock:
+            partials = {product_id: dict(summary) for product_id, summary in self.product_summaries.items()}
+        save_partials(partials, path, sources=[self.sink.name])
+    
+    def save_summary_csv(self, filename='summary.csv', merge_existing=None):
         if not self.product_summaries:
             print("⚠️ No product summaries to save")
             return
         
-        summary_list = []
-        for product_id, summary in self.product_summaries.items():
-            if summary['total_reviews'] > 0:
-                avg_rating = round(summary['ratings_sum'] / summary['total_reviews'], 1)
-            else:
-                avg_rating = 0.0
-            
-            summary_record = {
-                'product_id': summary['product_id'],
-                'product_name': summary['product_name'],
-                'category': summary['category'],
-                'subcategory': summary['subcategory'],
-                'brand': summary['brand'],
-                'price': summary['price'],
-                'avg_rating': avg_rating,
-                'total_reviews': summary['total_reviews'],
-                'positive_reviews': summary['positive_reviews'],
-                'mixed_reviews': summary['mixed_reviews'],
-                'negative_reviews': summary['negative_reviews'],
-                'url': summary['url'],
-                'thumbnail_url': summary['thumbnail_url']
-            }
-            summary_list.append(summary_record)
+        # Incremental runs only counted new reviews - add them to the previous totals
+        summaries = self.merged_summaries(filename, self.load_summary_csv, merge_existing)
+        summary_list = self.summary_records(summaries)
         
         fieldnames = ['product_id', 'product_name', 'category', 'subcategory', 'brand', 
                      'price', 'avg_rating', 'total_reviews', 'positive_reviews', 
@@ -556,8 +1121,44 @@ class DecathlonReviewScraper:
         
         print(f"✅ Saved {len(summary_list)} product summaries to {filename}")
     
+    def load_summary_parquet(self, filename):
+        return {str(row['product_id']): self.summary_from_record(row) for row in read_summary_parquet(filename)}
+    
+    def save_summary_parquet(self, filename='summary.parquet', merge_existing=None):
+        """Same rows as save_summary_csv, as a typed Parquet file"""
+        if not self.product_summaries:
+            print("⚠️ No product summaries to save")
+            return
+        summaries = self.merged_summaries(filename, self.load_summary_parquet, merge_existing)
+        summary_list = self.summary_records(summaries)
+        write_summary_parquet(summary_list, filename)
+        print(f"✅ Saved {len(summary_list)} product summaries to {filename}")
+    
+    def save_complete_parquet(self, root='complete_parquet'):
+        """Write the collected reviews as a Parquet dataset partitioned by category/product.
+        Every call adds new files, so incremental runs append like save_complete_csv does"""
+        if self.sink.persistent:
+            print(f"\n✅ {self.sink.count} reviews were streamed to {self.sink.name}")
+            return
+        if not self.all_reviews:
+            print("⚠️ No reviews to save")
+            return
+        write_reviews_dataset(self.all_reviews, root)
+        print(f"\n✅ Saved {len(self.all_reviews)} reviews to {root}/")
+    
     def close(self):
-        self.driver.quit()
+        self.sink.close()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+        self.close_browser()
+        if self.tab_pool is not None:
+            self.tab_pool.close()
+    
+    def close_browser(self):
+        if self.driver is not None and (self.owns_driver or self.tab_pool is not None):
+            self.driver.quit()
+        if self.http is not None:
+            self.http.close()
 
 
 if __name__ == "__main__":
@@ -637,7 +1238,26 @@ if __name__ == "__main__":
     
     
     # Create scraper with max 40 pages per product (you can change this number)
-    scraper = DecathlonReviewScraper(headless=False, max_pages=40)
+    # Set workers > 1 to run several browser sessions in parallel
+    # Set state_path (e.g. 'crawl_state.json') to only collect reviews newer than the last run
+    # Set checkpoint_path (e.g. 'checkpoint.jsonl') and resume=True to continue an interrupted run
+    # Pass sink=CsvReviewSink('complete.csv') to stream reviews to disk instead of keeping them in memory
+    # (with resume=True, CsvReviewSink('complete.csv', append=True) keeps the interrupted run's file)
+    # (or ParquetReviewSink('complete_parquet'); save_complete_parquet/save_summary_parquet write Parquet at the end)
+    # sink=SqliteStore('data/decathlon.db') upserts into SQLite; its product_summary view replaces summary.csv
+    # politeness=PolitenessScheduler() paces page loads per host instead of the fixed product_delay
+    parser = argparse.ArgumentParser(description='Scrape Decathlon Korea reviews from the last 6 months')
+    parser.add_argument('--lean', action='store_true',
+                        help='Block images, fonts, video and trackers (only the DOM text is needed)')
+    parser.add_argument('--watchdog', action='store_true',
+                        help='Restart Chrome every 300 pages, above 1.5 GB or when a command hangs for 60s')
+    args = parser.parse_args()
+    
+    scraper = DecathlonReviewScraper(headless=False, max_pages=40, workers=1, state_path=None,
+                                     checkpoint_path=None, resume=False, sink=None, lean=args.lean,
+                                     watchdog=DriverWatchdog(max_pages=300, max_rss_mb=1500) if args.watchdog else None)
+    if scraper.state and scraper.state.is_empty():
+        scraper.state.seed_from_csv('complete.csv')
     
     try:
         scraper.scrape_all_products(PRODUCT_URLS)
@@ -647,9 +1267,18 @@ if __name__ == "__main__":
         print(f"\n{'='*70}")
         print(f"📊 SCRAPING COMPLETE")
         print(f"{'='*70}")
-        print(f"✅ complete.csv - {len(scraper.all_reviews)} reviews")
+        print(f"✅ complete.csv - {scraper.sink.count} reviews")
         print(f"✅ summary.csv - {len(scraper.product_summaries)} products")
         print(f"{'='*70}\n")
+        scraper.waiter.report()
+        scraper.traffic.report()
+        if scraper.watchdog is not None:
+            scraper.watchdog.report()
+        if scraper.politeness is not None:
+            scraper.politeness.report()
+        scraper.metrics.report()
+        scraper.metrics.write_json('data/crawl_metrics_reviews.json')
+        scraper.metrics.write_prometheus('data/crawl_metrics_reviews.prom')
         
     finally:
         scraper.close()
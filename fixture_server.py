@@ -0,0 +1,284 @@
+"""
+Local stand-in for decathlon.co.kr that replays recorded responses
+
+Record a few live products once, then point the scraper at the local copy:
+
+    python fixture_server.py record fixtures/ https://www.decathlon.co.kr/p/...-8915926.html
+    python fixture_server.py serve fixtures/ --port 8000
+
+The served product URLs are printed on startup (same path, local host).
+
+Or serve generated products with the page structure the scraper relies on
+(review blocks with "대한민국 | dd/mm/yyyy", rating spans, a next-page
+button, a price element), at any size:
+
+    python fixture_server.py synthetic --products 20 --pages 10 --reviews 20 --latency 0.05
+
+--max-rate N answers 429 (Retry-After: 1) above N requests per second, like
+a rate-limited site, to exercise the politeness scheduler.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote, parse_qsl
+from http_fetcher import HttpReviewFetcher, HttpFetchError
+
+INDEX_FILE = 'index.json'
+
+
+def fixture_key(url):
+    """Path + query of a URL, used to match requests against recordings"""
+    parts = urlsplit(url)
+    key = unquote(parts.path)
+    if parts.query:
+        key += '?' + unquote(parts.query)
+    return key
+
+
+def load_index(fixture_dir):
+    path = os.path.join(fixture_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return {'products': [], 'responses': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_index(fixture_dir, index):
+    with open(os.path.join(fixture_dir, INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+
+def record_fixtures(urls, fixture_dir, max_pages=5):
+    """Save the product page and up to max_pages review pages of each URL"""
+    os.makedirs(fixture_dir, exist_ok=True)
+    index = load_index(fixture_dir)
+    fetcher = HttpReviewFetcher()
+
+    try:
+        for url in urls:
+            for page_number in range(1, max_pages + 1):
+                page_url = fetcher.review_page_url(url, page_number)
+                try:
+                    body = fetcher.fetch(page_url)
+                except HttpFetchError as e:
+                    print(f"  ⚠️ {e}")
+                    break
+                filename = hashlib.sha1(page_url.encode('utf-8')).hexdigest()[:16] + '.html'
+                with open(os.path.join(fixture_dir, filename), 'w', encoding='utf-8') as f:
+                    f.write(body)
+                index['responses'][fixture_key(page_url)] = {
+                    'file': filename,
+                    'content_type': 'text/html; charset=utf-8'
+                }
+                print(f"  ✓ Recorded {fixture_key(page_url)}")
+            if fixture_key(url) not in index['products']:
+                index['products'].append(fixture_key(url))
+    finally:
+        fetcher.close()
+        save_index(fixture_dir, index)
+    return index
+
+
+SYNTHETIC_NAMES = ['남성-러닝-반팔-티-런-드라이-500-kiprun', '등산-백팩-20l-아르페나즈-nh100-quechua',
+                   '여성-러닝-윈드-재킷-런-100-kiprun', '남성-하이킹-반팔-티-mh100-quechua',
+                   '러닝-소프트-플라스크-물병-250ml-kiprun', '남성-러닝-싱글렛-런-드라이-100-kalenji']
+SYNTHETIC_TEXTS = ['정말 좋아요 가볍고 통기성이 좋아서 만족합니다 추천해요',
+                   '사이즈가 조금 작지만 품질은 괜찮습니다 보통이에요',
+                   '한 번 빨았더니 보풀이 생겨서 실망했어요 별로입니다',
+                   '가격 대비 최고입니다 러닝할 때 편하고 완벽해요',
+                   '배송은 빨랐는데 색상이 사진과 달라서 조금 아쉬워요']
+
+
+class SyntheticCatalog:
+    """Generated products: every product has pages x reviews_per_page reviews,
+    newest first, one review per review_interval days back from today"""
+
+    def __init__(self, products=10, pages=5, reviews_per_page=20, review_interval=0.5, seed=0):
+        self.products = products
+        self.pages = pages
+        self.reviews_per_page = reviews_per_page
+        self.review_interval = review_interval  # Days between consecutive reviews
+        self.seed = seed
+        self.today = datetime.now()
+
+    def product_path(self, n):
+        name = SYNTHETIC_NAMES[n % len(SYNTHETIC_NAMES)]
+        return f"/r/{n:08d}-0000-4000-8000-000000000000_{name}-{9000000 + n}.html"
+
+    def product_paths(self):
+        return [self.product_path(n) for n in range(self.products)]
+
+    def review_block(self, rng, index):
+        rating = rng.choice([5.0, 5.0, 4.0, 4.0, 3.0, 2.0, 1.0])
+        date = self.today - timedelta(days=index * self.review_interval)
+        text = rng.choice(SYNTHETIC_TEXTS)
+        return (f'<div class="review-card"><div class="review-body">'
+                f'<span class="css-18wdkpi">{rating:.1f}</span>'
+                f'<p>{text} (#{index + 1})</p>'
+                f'<div><span>대한민국 | {date.strftime("%d/%m/%Y")}</span></div>'
+                f'</div></div>')
+
+    def page(self, n, page_number):
+        rng = random.Random(self.seed * 1_000_003 + n * 1009 + page_number)
+        first = (page_number - 1) * self.reviews_per_page
+        reviews = ''.join(self.review_block(rng, first + i) for i in range(self.reviews_per_page))
+        next_url = f"{self.product_path(n)}?page={page_number + 1}"
+        if page_number < self.pages:
+            # The browser path clicks the button; the static path only checks it is enabled
+            paginator = (f'<button data-testid="next-page" '
+                         f'onclick="location.href=\'{next_url}\'">다음</button>')
+        else:
+            paginator = '<button data-testid="next-page" disabled class="disabled">다음</button>'
+        return (f'<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8">'
+                f'<title>Product {9000000 + n} | 데카트론</title>'
+                f'<meta property="og:image" content="https://contents.mediadecathlon.com/p{9000000 + n}/sq.jpg">'
+                f'</head><body><h1>Product {9000000 + n}</h1>'
+                f'<span data-testid="price">{19900 + n * 1000:,}원</span>'
+                f'<section id="reviews">{reviews}</section>'
+                f'<nav aria-label="pagination">{paginator}</nav></body></html>')
+
+    def lookup(self, key):
+        path, _, query = key.partition('?')
+        paths = {self.product_path(n): n for n in range(self.products)}
+        if path not in paths:
+            return None
+        page_number = int(dict(parse_qsl(query)).get('page', 1))
+        if not 1 <= page_number <= self.pages:
+            return None
+        return self.page(paths[path], page_number).encode('utf-8')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real site
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def do_GET(self):
+        server = self.server
+        server.requests_served += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if not server.admit():
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body, content_type = server.lookup(fixture_key(self.path))
+        if body is None:
+            self.send_response(404)
+            body, content_type = b'not recorded', 'text/plain'
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Serves recorded responses from a fixture directory"""
+    daemon_threads = True
+
+    def __init__(self, fixture_dir=None, host='127.0.0.1', port=0, latency=0.0, synthetic=None, max_rate=None):
+        super().__init__((host, port), FixtureHandler)
+        self.fixture_dir = fixture_dir
+        self.latency = latency  # Seconds added to every response
+        self.max_rate = max_rate  # Requests per second before answering 429 (None: unlimited)
+        self.requests_throttled = 0
+        self._window = []  # Times of the requests admitted in the last second
+        self._window_lock = threading.Lock()
+        self.synthetic = synthetic  # Optional SyntheticCatalog served alongside the recordings
+        self.requests_served = 0
+        self.index = load_index(fixture_dir) if fixture_dir else {'products': [], 'responses': {}}
+
+    def admit(self):
+        """False when the request goes over max_rate (sliding one-second window)"""
+        if not self.max_rate:
+            return True
+        now = time.monotonic()
+        with self._window_lock:
+            self._window = [t for t in self._window if now - t < 1.0]
+            if len(self._window) >= self.max_rate:
+                self.requests_throttled += 1
+                return False
+            self._window.append(now)
+            return True
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def lookup(self, key):
+        if self.synthetic is not None:
+            body = self.synthetic.lookup(key)
+            if body is not None:
+                return body, 'text/html; charset=utf-8'
+        entry = self.index['responses'].get(key)
+        if not entry:
+            return None, None
+        with open(os.path.join(self.fixture_dir, entry['file']), 'rb') as f:
+            return f.read(), entry.get('content_type', 'text/html; charset=utf-8')
+
+    def product_urls(self):
+        paths = list(self.index['products'])
+        if self.synthetic is not None:
+            paths += self.synthetic.product_paths()
+        return [self.base_url + path for path in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record or serve Decathlon fixture pages')
+    sub = parser.add_subparsers(dest='command', required=True)
+    record = sub.add_parser('record')
+    record.add_argument('fixture_dir')
+    record.add_argument('urls', nargs='+')
+    record.add_argument('--max-pages', type=int, default=5)
+    serve = sub.add_parser('serve')
+    serve.add_argument('fixture_dir')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--latency', type=float, default=0.0)
+    serve.add_argument('--max-rate', type=float, help='Answer 429 above this many requests per second')
+    synthetic = sub.add_parser('synthetic')
+    synthetic.add_argument('--products', type=int, default=10)
+    synthetic.add_argument('--pages', type=int, default=5)
+    synthetic.add_argument('--reviews', type=int, default=20, help='Reviews per page')
+    synthetic.add_argument('--port', type=int, default=8000)
+    synthetic.add_argument('--latency', type=float, default=0.0)
+    synthetic.add_argument('--max-rate', type=float, help='Answer 429 above this many requests per second')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record_fixtures(args.urls, args.fixture_dir, args.max_pages)
+        return
+
+    if args.command == 'synthetic':
+        catalog = SyntheticCatalog(args.products, args.pages, args.reviews)
+        server = FixtureServer(port=args.port, latency=args.latency, synthetic=catalog, max_rate=args.max_rate)
+        print(f"🧪 Serving {args.products} synthetic products "
+              f"({args.pages} pages x {args.reviews} reviews) on {server.base_url}")
+    else:
+        server = FixtureServer(args.fixture_dir, port=args.port, latency=args.latency, max_rate=args.max_rate)
+        print(f"🧪 Serving {len(server.index['responses'])} recorded responses on {server.base_url}")
+    for url in server.product_urls():
+        print(f"  {url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Browserless HTTP backend for DecathlonReviewScraper
+
+Fetches the product page and its paginated review pages with a pooled
+keep-alive requests.Session and parses them with static_parser, so a
+product costs a few small HTTP requests instead of a full Chrome page load.
+"""
+
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from static_parser import parse_product_page
+from politeness import THROTTLE_STATUSES, retry_after_seconds
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class HttpFetchError(Exception):
+    pass
+
+
+def review_page_url(url, page_number, page_param='page'):
+    """URL of the given review page (page 1 is the product page itself)"""
+    if page_number <= 1:
+        return url
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != page_param]
+    query.append((page_param, str(page_number)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def cutoff_search(max_pages):
+    """Finds the last review page inside the date window. A generator: it yields the next page
+    to look at and is sent back whether that page is inside the window; it returns the last page.
+    Reviews are newest first, so in-window pages form a prefix: gallop (2, 3, 5, 9, ...) until
+    a page falls outside, then binary-search between the last good and the first bad page."""
+    if not (yield 1):
+        return 1
+    good, bad, step = 1, None, 1
+    while bad is None:
+        page_number = min(good + step, max_pages)
+        if page_number == good:
+            return good  # Every page up to max_pages is inside the window
+        if (yield page_number):
+            good, step = page_number, step * 2
+        else:
+            bad = page_number
+    while bad - good > 1:
+        middle = (good + bad) // 2
+        if (yield middle):
+            good = middle
+        else:
+            bad = middle
+    return good
+
+class HttpReviewFetcher:
+    """Walks one product's review pages over plain HTTP, like the browser does"""
+
+    def __init__(self, timeout=15, pool_size=10, page_param='page', retries=2, cache=None, politeness=None):
+        self.timeout = timeout
+        self.cache = cache  # Optional PageSnapshotCache that keeps every fetched page
+        self.politeness = politeness  # Optional PolitenessScheduler that paces every request
+        self.page_param = page_param  # Query parameter that selects the review page
+        self.retries = retries
+        self.session = requests.Session()
+        # With a scheduler, 429/503 responses reach it (and are retried after its backoff) instead of
+        # urllib3 sleeping through Retry-After on its own
+        max_retries = Retry(total=retries, respect_retry_after_header=politeness is None)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'ko-KR,ko;q=0.9'
+        })
+        self.stats = {'requests': 0, 'bytes': 0, 'seconds': 0.0}
+
+        self.product_url = None
+        self.page_number = 0
+        self.page = None
+
+    def get(self, url):
+        """One GET, paced and reported to the politeness scheduler if there is one"""
+        if self.politeness is not None:
+            self.politeness.acquire(url)
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            if self.politeness is not None:
+                self.politeness.release(url, time.perf_counter() - start, error=True)
+            raise HttpFetchError(f"{url}: {e}") from e
+        finally:
+            self.stats['seconds'] += time.perf_counter() - start
+            self.stats['requests'] += 1
+        if self.politeness is not None:
+            self.politeness.release(url, time.perf_counter() - start, status=response.status_code,
+                                    retry_after=retry_after_seconds(response.headers.get('Retry-After')))
+        return response
+
+    def fetch(self, url):
+        response = self.get(url)
+        for _ in range(self.retries if self.politeness is not None else 0):
+            if response.status_code not in THROTTLE_STATUSES:
+                break
+            print(f"    🚦 {url}: HTTP {response.status_code}, retrying at a slower pace")
+            response = self.get(url)
+        self.stats['bytes'] += len(response.content)
+        if response.status_code >= 400:
+            raise HttpFetchError(f"{url}: HTTP {response.status_code}")
+        response.encoding = response.encoding or 'utf-8'
+        return response.text
+
+    def review_page_url(self, url, page_number):
+        return review_page_url(url, page_number, self.page_param)
+
+    def _load(self, url, page_number):
+        page_html = self.fetch(self.review_page_url(url, page_number))
+        if self.cache is not None:
+            self.cache.put('reviews', url, page_number, page_html)
+        return parse_product_page(page_html)
+
+    def open_product(self, url):
+        """Load page 1 of a product. Returns (price, thumbnail_url)"""
+        self.product_url = url
+        self.page_number = 1
+        self.page = self._load(url, 1)
+
+        price = self.page['price']
+        thumbnail = self.page['thumbnail_url']
+        print(f"  💰 Price: {price:,}원" if price else "  ⚠️ Price not found")
+        print("  🖼️ Thumbnail found" if thumbnail else "  ⚠️ Thumbnail not found")
+        return price, thumbnail
+
+    def current_reviews(self):
+        return self.page['reviews'] if self.page else []
+
+    def next_page(self):
+        """Move to the next review page. Returns False when there is none"""
+        if not self.page or not self.page['has_next']:
+            print(f"    ⏹️ No more pages")
+            return False
+        try:
+            self.page = self._load(self.product_url, self.page_number + 1)
+        except HttpFetchError as e:
+            print(f"    ❌ Error fetching next page: {e}")
+            return False
+        self.page_number += 1
+        return True
+
+    def goto_page(self, page_number):
+        """Jump straight to a review page of the current product"""
+        try:
+            self.page = self._load(self.product_url, page_number)
+        except HttpFetchError as e:
+            print(f"    ❌ Error fetching page {page_number}: {e}")
+            return False
+        self.page_number = page_number
+        return True
+
+    def close(self):
+        self.session.close()
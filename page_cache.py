@@ -0,0 +1,131 @@
+"""
+Raw page snapshot cache and offline replay
+
+PageSnapshotCache stores gzip-compressed page HTML content-addressed by its
+SHA-256, so identical pages are stored once. An append-only index maps
+(kind, url, page) to a snapshot. CachedPageFetcher serves those snapshots
+with the same interface as HttpReviewFetcher, so extraction can be re-run
+against the cache with no network and no browser.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from http_fetcher import HttpFetchError
+from static_parser import parse_product_page
+
+
+class PageSnapshotCache:
+    """Content-addressed store of raw page HTML"""
+
+    def __init__(self, root='data/page_cache'):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.jsonl')
+        self.index = {}
+        self.stats = {'stored': 0, 'deduplicated': 0, 'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.index[entry['key']] = entry['sha']
+
+    @staticmethod
+    def key(kind, url, page_number=1):
+        return f"{kind}:{url}#{page_number}"
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest + '.html.gz')
+
+    def put(self, kind, url, page_number, page_html):
+        """Store a snapshot. Returns its content hash"""
+        data = page_html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        key = self.key(kind, url, page_number)
+        with self._lock:
+            if os.path.exists(path):
+                self.stats['deduplicated'] += 1
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + '.tmp'
+                with gzip.open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self.stats['stored'] += 1
+            if self.index.get(key) != digest:
+                self.index[key] = digest
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'key': key, 'sha': digest}, ensure_ascii=False) + '\n')
+        return digest
+
+    def get(self, kind, url, page_number=1):
+        digest = self.index.get(self.key(kind, url, page_number))
+        if not digest or not os.path.exists(self._object_path(digest)):
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def urls(self, kind):
+        """URLs that have at least page 1 of the given kind cached"""
+        prefix = f"{kind}:"
+        return [key[len(prefix):-2] for key in self.index if key.startswith(prefix) and key.endswith('#1')]
+
+
+class CachedPageFetcher:
+    """Replays cached review pages with HttpReviewFetcher's interface"""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.stats = {'requests': 0, 'bytes': 0, 'seconds': 0.0}
+        self.product_url = None
+        self.page_number = 0
+        self.page = None
+
+    def _load(self, url, page_number):
+        page_html = self.cache.get('reviews', url, page_number)
+        if page_html is None:
+            return None
+        self.stats['requests'] += 1
+        self.stats['bytes'] += len(page_html)
+        return parse_product_page(page_html)
+
+    def open_product(self, url):
+        self.product_url = url
+        self.page_number = 1
+        self.page = self._load(url, 1)
+        if self.page is None:
+            raise HttpFetchError(f"{url}: not in the snapshot cache")
+
+        price = self.page['price']
+        thumbnail = self.page['thumbnail_url']
+        print(f"  💰 Price: {price:,}원" if price else "  ⚠️ Price not found")
+        print("  🖼️ Thumbnail found" if thumbnail else "  ⚠️ Thumbnail not found")
+        return price, thumbnail
+
+    def current_reviews(self):
+        return self.page['reviews'] if self.page else []
+
+    def goto_page(self, page_number):
+        page = self._load(self.product_url, page_number)
+        if page is None:
+            return False
+        self.page, self.page_number = page, page_number
+        return True
+
+    def next_page(self):
+        if self.goto_page(self.page_number + 1):
+            return True
+        print(f"    ⏹️ No more cached pages")
+        return False
+
+    def close(self):
+        pass
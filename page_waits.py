@@ -0,0 +1,277 @@
+"""
+Event-driven waits for the Decathlon crawlers
+
+Instead of sleeping a fixed number of seconds, each wait polls the page
+(or listens for DOM mutations) and returns as soon as the page is ready.
+Every wait has a timeout budget and records how long it actually took.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+REVIEW_XPATH = '//*[contains(text(), "대한민국")]'
+
+# Short fingerprint of the reviews currently on the page, used to detect a page change
+REVIEW_SIGNATURE_JS = """
+var snapshot = document.evaluate(arguments[0], document, null,
+                                 XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var parts = [];
+for (var i = 0; i < snapshot.snapshotLength; i++) {
+    var node = snapshot.snapshotItem(i);
+    var container = node.parentElement || node;
+    if (container.parentElement) container = container.parentElement;
+    parts.push((container.textContent || '').trim().slice(0, 80));
+}
+return snapshot.snapshotLength + ':' + parts.join('|');
+"""
+
+# Resolves once no DOM mutation has happened for quietMs (or the budget runs out)
+DOM_QUIET_JS = """
+var quietMs = arguments[0], timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), last = Date.now(), mutations = 0;
+var observer = new MutationObserver(function(records) {
+    mutations += records.length;
+    last = Date.now();
+});
+observer.observe(document.documentElement,
+                 {childList: true, subtree: true, attributes: true, characterData: true});
+(function check() {
+    var now = Date.now();
+    if (now - last >= quietMs || now - start >= timeoutMs) {
+        observer.disconnect();
+        done({quiet: now - last >= quietMs, mutations: mutations, elapsed: now - start});
+    } else {
+        setTimeout(check, Math.min(50, quietMs));
+    }
+})();
+"""
+
+
+# Opens the collapsed section headers we extract from in one pass, walks down the page in
+# stepPx steps with a frame between steps (so IntersectionObserver-driven lazy sections see
+# every part of it), then resolves once no DOM mutation has happened for quietMs (or the
+# budget runs out)
+EXPAND_SECTIONS_JS = """
+var selectors = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2], stepPx = arguments[3];
+var titles = arguments[4] || [];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), last = Date.now(), mutations = 0;
+var observer = new MutationObserver(function(records) {
+    mutations += records.length;
+    last = Date.now();
+});
+observer.observe(document.documentElement,
+                 {childList: true, subtree: true, attributes: true, characterData: true});
+
+// A header is open when it says so or when the panel it controls (or follows it) is shown
+function isOpen(header) {
+    if (header.getAttribute('aria-expanded') === 'true') return true;
+    if (header.getAttribute('aria-expanded') === 'false') return false;
+    var id = header.getAttribute('aria-controls');
+    var panel = (id && document.getElementById(id)) || header.nextElementSibling;
+    if (!panel) return false;
+    var style = getComputedStyle(panel);
+    return panel.getClientRects().length > 0 && panel.offsetHeight > 0
+        && style.display !== 'none' && style.visibility !== 'hidden';
+}
+
+var seen = new Set(), candidates = 0, opened = 0;
+function open(el) {
+    var header = el.closest('button,[role="button"],[aria-expanded]') || el;
+    if (seen.has(header)) return;
+    seen.add(header);
+    candidates++;
+    if (isOpen(header)) return;
+    try { header.click(); opened++; } catch (e) {}
+}
+
+// Accordion headers by selector, section headings (h2) only when their text is one we extract
+function openHeaders() {
+    selectors.forEach(function(selector) {
+        document.querySelectorAll(selector).forEach(open);
+    });
+    if (!titles.length) return;
+    document.querySelectorAll('h2').forEach(function(h2) {
+        var text = h2.textContent || '';
+        if (titles.some(function(title) { return text.indexOf(title) !== -1; })) open(h2);
+    });
+}
+
+function check() {
+    var now = Date.now();
+    if (now - last >= quietMs || now - start >= timeoutMs) {
+        observer.disconnect();
+        done({opened: opened, candidates: candidates, mutations: mutations,
+              quiet: now - last >= quietMs, elapsed: now - start});
+    } else {
+        setTimeout(check, Math.min(50, quietMs));
+    }
+}
+
+function nextFrame(fn) {
+    var called = false;
+    function once() { if (!called) { called = true; setTimeout(fn, 50); } }
+    requestAnimationFrame(once);
+    setTimeout(once, 100);  // Background tabs get no animation frames
+}
+
+// Lazy sections render when scrolled into view: walk down the page (it may grow as we go),
+// then wait for quiet counted from the end of the walk
+var y = 0;
+(function walk() {
+    if (y < document.body.scrollHeight && Date.now() - start < timeoutMs) {
+        window.scrollTo(0, y);
+        openHeaders();  // Sections rendered by this step are opened as they appear
+        y += stepPx;
+        nextFrame(walk);
+    } else {
+        openHeaders();
+        window.scrollTo(0, 0);
+        last = Date.now();
+        check();
+    }
+})();
+"""
+
+class PageWaiter:
+    """Waits on page readiness conditions and keeps per-wait timing stats"""
+
+    def __init__(self, driver, timeout=15, poll=0.1):
+        self.driver = driver
+        self.timeout = timeout  # Default budget (seconds) for a single wait
+        self.poll = poll
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def share_stats(self, other):
+        """Record into another waiter's stats (used by parallel workers)"""
+        self.stats = other.stats
+        self._lock = other._lock
+
+    def _record(self, name, elapsed, timed_out):
+        with self._lock:
+            entry = self.stats.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+            entry['count'] += 1
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            if timed_out:
+                entry['timeouts'] += 1
+
+    def until(self, name, condition, timeout=None):
+        """Wait until condition(driver) is truthy. Returns its value, or None on timeout"""
+        budget = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, budget, poll_frequency=self.poll).until(condition)
+            self._record(name, time.perf_counter() - start, False)
+            return result
+        except TimeoutException:
+            self._record(name, time.perf_counter() - start, True)
+            return None
+
+    def page_ready(self, timeout=None):
+        """Wait until the document has finished parsing"""
+        return self.until(
+            'page_ready',
+            lambda d: d.execute_script("return document.readyState") in ('interactive', 'complete'),
+            timeout
+        )
+
+    def any_element(self, name, selectors, timeout=None):
+        """Wait until any of the CSS selectors matches an element with text or a src"""
+        def found(driver):
+            return driver.execute_script("""
+                var selectors = arguments[0];
+                for (var i = 0; i < selectors.length; i++) {
+                    var el = document.querySelector(selectors[i]);
+                    if (el && ((el.textContent || '').trim() || el.getAttribute('src'))) return selectors[i];
+                }
+                return null;
+            """, selectors)
+        return self.until(name, found, timeout)
+
+    def review_signature(self):
+        try:
+            return self.driver.execute_script(REVIEW_SIGNATURE_JS, REVIEW_XPATH)
+        except WebDriverException:
+            return ''
+
+    def reviews_present(self, timeout=None):
+        """Wait until at least one review date line is in the DOM"""
+        def present(driver):
+            signature = self.review_signature()
+            return signature if signature and not signature.startswith('0:') else None
+        return self.until('reviews_present', present, timeout)
+
+    def reviews_changed(self, old_signature, timeout=None):
+        """Wait until the review list differs from old_signature (after a page click)"""
+        def changed(driver):
+            signature = self.review_signature()
+            if signature and signature != old_signature and not signature.startswith('0:'):
+                return signature
+            return None
+        return self.until('reviews_changed', changed, timeout)
+
+    @contextmanager
+    def _script_timeout(self, seconds):
+        """Let async scripts run for at least seconds, then put the session's script timeout back
+        (a DriverWatchdog's command_timeout stays in force outside the wait)"""
+        try:
+            previous = self.driver.timeouts.script
+        except (AttributeError, WebDriverException):
+            previous = None
+        if previous is not None and previous >= seconds:
+            yield
+            return
+        self.driver.set_script_timeout(seconds)
+        try:
+            yield
+        finally:
+            if previous is not None:
+                try:
+                    self.driver.set_script_timeout(previous)
+                except WebDriverException:
+                    pass
+
+    def dom_quiet(self, quiet_ms=500, timeout=None):
+        """Wait until the DOM has not mutated for quiet_ms milliseconds"""
+        budget = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        try:
+            with self._script_timeout(budget + 5):
+                result = self.driver.execute_async_script(DOM_QUIET_JS, quiet_ms, int(budget * 1000))
+            timed_out = not (result or {}).get('quiet', False)
+        except WebDriverException:
+            result, timed_out = None, True
+        self._record('dom_quiet', time.perf_counter() - start, timed_out)
+        return result
+
+    def expand_sections(self, selectors, titles=(), quiet_ms=400, timeout=None, step_px=400):
+        """Scroll through the page step by step, opening the collapsed headers matched by selectors
+        and the h2 headings whose text contains one of titles, and wait for the DOM to settle.
+        Returns {opened, candidates, mutations, quiet, elapsed} or None on error"""
+        budget = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        try:
+            with self._script_timeout(budget + 5):
+                result = self.driver.execute_async_script(EXPAND_SECTIONS_JS, selectors, quiet_ms,
+                                                          int(budget * 1000), step_px, list(titles))
+            timed_out = not (result or {}).get('quiet', False)
+        except WebDriverException:
+            result, timed_out = None, True
+        self._record('expand_sections', time.perf_counter() - start, timed_out)
+        return result
+
+    def report(self):
+        """Print how long each kind of wait took"""
+        if not self.stats:
+            return
+        print("\n⏱️ Wait times:")
+        for name, entry in sorted(self.stats.items()):
+            avg = entry['total'] / entry['count'] if entry['count'] else 0.0
+            print(f"  {name}: {entry['count']}x, avg {avg:.2f}s, max {entry['max']:.2f}s, "
+                  f"total {entry['total']:.1f}s, timeouts {entry['timeouts']}")
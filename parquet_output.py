@@ -0,0 +1,203 @@
+"""
+Columnar (Parquet) output for reviews and summaries
+
+Reviews are written as a Parquet dataset partitioned by category and product
+(category=러닝/product_id=8915926/part-....parquet). The repeated string
+columns are dictionary-encoded, rating is a float and date a real date, so an
+analytics job reads only the columns and partitions it needs:
+
+    read_reviews_dataset('data/complete_parquet')
+
+Partition values are typed as strings (reviews_partitioning): with plain
+partitioning='hive', pyarrow would infer product_id as an integer.
+
+Convert existing CSV output with:
+
+    python parquet_output.py complete.csv summary.csv --out data/
+"""
+
+import argparse
+import csv
+import os
+import threading
+import uuid
+from datetime import date
+from crawl_state import detect_delimiter
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed for Parquet output
+    pa = ds = pq = None
+
+PARTITION_COLUMNS = ['category', 'product_id']
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+
+
+def reviews_partitioning():
+    """Hive partitioning with string keys, so product_id '0123' stays '0123' when read back"""
+    require_pyarrow()
+    return ds.partitioning(pa.schema([(name, pa.string()) for name in PARTITION_COLUMNS]), flavor='hive')
+
+
+def read_reviews_dataset(root):
+    """The partitioned review dataset (category/product_id come back as strings)"""
+    return ds.dataset(root, format='parquet', partitioning=reviews_partitioning())
+
+
+def _dictionary(values):
+    return pa.array(values, type=pa.string()).dictionary_encode()
+
+
+def _parse_date(value):
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None  # 'Unknown'
+
+
+def _float(value):
+    return float(value) if value not in (None, '') else None
+
+
+def _int(value):
+    return int(float(value)) if value not in (None, '') else None
+
+
+def reviews_table(rows):
+    """Typed Arrow table of review rows (REVIEW_FIELDS dicts)"""
+    require_pyarrow()
+    columns = {
+        'product_id': _dictionary([str(row['product_id']) for row in rows]),
+        'product_name': _dictionary([row['product_name'] for row in rows]),
+        'category': _dictionary([row['category'] for row in rows]),
+        'subcategory': _dictionary([row['subcategory'] for row in rows]),
+        'brand': _dictionary([row['brand'] for row in rows]),
+        'rating': pa.array([_float(row['rating']) for row in rows], type=pa.float64()),
+        'review_text': pa.array([row['review_text'] for row in rows], type=pa.string()),
+        'sentiment': _dictionary([row['sentiment'] for row in rows]),
+        'date': pa.array([_parse_date(row['date']) for row in rows], type=pa.date32())
+    }
+    return pa.table(columns)
+
+
+def write_reviews_dataset(rows, root):
+    """Add rows to the partitioned dataset at root (new files, existing ones are kept)"""
+    if not rows:
+        return
+    pq.write_to_dataset(reviews_table(rows), root, partitioning=reviews_partitioning(),
+                        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                        existing_data_behavior='overwrite_or_ignore',
+                        compression='zstd', use_dictionary=True)
+
+
+def summary_table(records):
+    """Typed Arrow table of summary.csv records"""
+    require_pyarrow()
+    columns = {
+        'product_id': pa.array([str(r['product_id']) for r in records], type=pa.string()),
+        'product_name': _dictionary([r['product_name'] for r in records]),
+        'category': _dictionary([r['category'] for r in records]),
+        'subcategory': _dictionary([r['subcategory'] for r in records]),
+        'brand': _dictionary([r['brand'] for r in records]),
+        'price': pa.array([_int(r['price']) for r in records], type=pa.int64()),
+        'avg_rating': pa.array([_float(r['avg_rating']) for r in records], type=pa.float64()),
+        'total_reviews': pa.array([_int(r['total_reviews']) for r in records], type=pa.int32()),
+        'positive_reviews': pa.array([_int(r['positive_reviews']) for r in records], type=pa.int32()),
+        'mixed_reviews': pa.array([_int(r['mixed_reviews']) for r in records], type=pa.int32()),
+        'negative_reviews': pa.array([_int(r['negative_reviews']) for r in records], type=pa.int32()),
+        'url': pa.array([r['url'] for r in records], type=pa.string()),
+        'thumbnail_url': pa.array([r['thumbnail_url'] or None for r in records], type=pa.string())
+    }
+    return pa.table(columns)
+
+
+def write_summary_parquet(records, filename):
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{filename}.tmp"
+    pq.write_table(summary_table(records), tmp_path, compression='zstd', use_dictionary=True)
+    os.replace(tmp_path, filename)
+
+
+def read_summary_parquet(filename):
+    """summary.parquet rows as dicts (same keys as summary.csv)"""
+    require_pyarrow()
+    return pq.read_table(filename).to_pylist()
+
+
+class ParquetReviewSink:
+    """Streams rows into the partitioned Parquet dataset. Rows are buffered and written at
+    product boundaries (one file per product); with a checkpoint every page is flushed,
+    which makes smaller files"""
+    persistent = True
+    keeps_previous = True  # New files are added next to the previous run's
+
+    def __init__(self, root='complete_parquet', batch_size=5000):
+        require_pyarrow()
+        self.name = root
+        self.root = root
+        self.batch_size = batch_size
+        self.count = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def write_rows(self, rows):
+        with self._lock:
+            self._buffer.extend(rows)
+            self.count += len(rows)
+            if len(self._buffer) >= self.batch_size:
+                self._write_buffer()
+
+    def _write_buffer(self):
+        if self._buffer:
+            write_reviews_dataset(self._buffer, self.root)
+            self._buffer = []
+
+    def flush(self):
+        with self._lock:
+            self._write_buffer()
+
+    def end_product(self, summary=None):
+        with self._lock:
+            self._write_buffer()
+
+    def close(self):
+        self.flush()
+
+
+def read_csv_rows(filename):
+    with open(filename, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f, delimiter=detect_delimiter(filename)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert complete.csv/summary.csv to Parquet')
+    parser.add_argument('complete', help='complete.csv (comma- or tab-separated)')
+    parser.add_argument('summary', nargs='?', help='summary.csv')
+    parser.add_argument('--out', default='data', help='Output directory')
+    args = parser.parse_args()
+    require_pyarrow()
+
+    rows = read_csv_rows(args.complete)
+    root = os.path.join(args.out, 'complete_parquet')
+    write_reviews_dataset(rows, root)
+    print(f"✅ {len(rows)} reviews → {root}/")
+    if args.summary:
+        records = read_csv_rows(args.summary)
+        filename = os.path.join(args.out, 'summary.parquet')
+        write_summary_parquet(records, filename)
+        print(f"✅ {len(records)} product summaries → {filename}")
+
+
+if __name__ == "__main__":
+    main()
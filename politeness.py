@@ -0,0 +1,203 @@
+"""
+Adaptive per-host pacing for page loads and HTTP requests
+
+Instead of a fixed sleep between products, every request to a host first
+takes a token from that host's bucket (refilled at `rate` requests per
+second, up to `burst`) and a slot under its concurrency limit. Both follow
+AIMD: each quick, successful response adds a little rate and concurrency;
+a throttle response (403/429/503), a server error, a failed request or a
+response slower than target_latency halves them (at most once per round
+trip, so one burst of failures counts once). A Retry-After header pauses
+the host for as long as it asks. Browser page loads include rendering and
+the page waits, so they are held to the looser browser_latency instead.
+
+    scheduler = PolitenessScheduler(rate=1.0, max_rate=8.0)
+    scraper = DecathlonReviewScraper(backend='http', politeness=scheduler)
+    ...
+    scheduler.report()                    # current rate/concurrency per host
+
+One scheduler paces every worker thread of a process (and the async engine);
+separate processes each pace themselves.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+THROTTLE_STATUSES = (403, 429, 503)  # Responses that mean "slow down"
+
+
+def retry_after_seconds(value):
+    """Seconds asked for by a Retry-After header (delta-seconds or an HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostPace:
+    """Token bucket, concurrency limit and response statistics of one host"""
+
+    def __init__(self, rate, burst, concurrency):
+        self.rate = rate  # Requests per second
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.concurrency = float(concurrency)  # Requests in flight allowed (fractional while growing)
+        self.in_flight = 0
+        self.paused_until = 0.0  # Retry-After
+        self.last_decrease = 0.0
+        self.latency = None  # Moving average of response time
+        self.stats = {'requests': 0, 'throttled': 0, 'errors': 0, 'slow': 0, 'backoffs': 0,
+                      'waited': 0.0, 'min_rate': rate, 'max_rate': rate}
+
+
+class PolitenessScheduler:
+    """Per-host token buckets whose rate and concurrency adapt to how the host responds (AIMD)"""
+
+    def __init__(self, rate=1.0, burst=2, min_rate=0.2, max_rate=8.0, concurrency=2, max_concurrency=8,
+                 target_latency=3.0, browser_latency=20.0, increase=0.5, decrease=0.5):
+        self.rate = rate  # Starting requests per second per host
+        self.burst = burst  # Tokens a quiet host can save up
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.concurrency = concurrency  # Starting requests in flight per host
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency  # Slower responses count as the host struggling
+        self.browser_latency = browser_latency  # The same for browser loads (navigation + render + waits)
+        self.increase = increase  # Requests/second added per good response
+        self.decrease = decrease  # Factor applied to rate and concurrency on a backoff
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    def _host(self, url):
+        key = urlsplit(url).netloc or url
+        host = self._hosts.get(key)
+        if host is None:
+            host = self._hosts[key] = HostPace(self.rate, self.burst, self.concurrency)
+        return host
+
+    def _reserve(self, host, now):
+        """Take a token and a slot. Returns 0 when both were taken, otherwise the seconds to wait
+        (None: wait for a request to finish). Called with the lock held"""
+        if now < host.paused_until:
+            return host.paused_until - now
+        if host.in_flight >= max(1, int(host.concurrency)):
+            return None
+        host.tokens = min(self.burst, host.tokens + (now - host.updated) * host.rate)
+        host.updated = now
+        if host.tokens < 1:
+            return (1 - host.tokens) / host.rate
+        host.tokens -= 1
+        host.in_flight += 1
+        host.stats['requests'] += 1
+        return 0
+
+    def acquire(self, url):
+        """Block until a request to url's host may start; pair with release()"""
+        start = time.monotonic()
+        with self._released:
+            host = self._host(url)
+            while True:
+                delay = self._reserve(host, time.monotonic())
+                if delay == 0:
+                    break
+                self._released.wait(delay)
+            host.stats['waited'] += time.monotonic() - start
+
+    async def acquire_async(self, url):
+        """acquire() for coroutines: waits with asyncio.sleep instead of blocking the loop"""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                host = self._host(url)
+                delay = self._reserve(host, time.monotonic())
+                if delay == 0:
+                    host.stats['waited'] += time.monotonic() - start
+                    return
+            await asyncio.sleep(delay if delay is not None else 0.05)
+
+    def release(self, url, seconds, status=None, error=False, retry_after=None, browser=False):
+        """Report how the request went: its response time, HTTP status (if known) and whether it
+        failed (browser=True: a page load in Chrome, judged against browser_latency).
+        Fast successes speed the host up, throttles/errors/slow responses back off"""
+        with self._released:
+            host = self._host(url)
+            host.in_flight = max(0, host.in_flight - 1)
+            host.latency = seconds if host.latency is None else 0.8 * host.latency + 0.2 * seconds
+            if status in THROTTLE_STATUSES:
+                host.stats['throttled'] += 1
+                self._back_off(host, retry_after)
+            elif error or (status is not None and status >= 500):
+                host.stats['errors'] += 1
+                self._back_off(host, retry_after)
+            elif seconds > (self.browser_latency if browser else self.target_latency):
+                host.stats['slow'] += 1
+                self._back_off(host)
+            else:
+                host.rate = min(self.max_rate, host.rate + self.increase)
+                host.concurrency = min(self.max_concurrency, host.concurrency + 1 / host.concurrency)
+            host.stats['min_rate'] = min(host.stats['min_rate'], host.rate)
+            host.stats['max_rate'] = max(host.stats['max_rate'], host.rate)
+            self._released.notify_all()
+
+    def _back_off(self, host, retry_after=None):
+        now = time.monotonic()
+        if retry_after:
+            host.paused_until = max(host.paused_until, now + retry_after)
+        # Requests already in flight report the same trouble: one decrease per round trip
+        if now - host.last_decrease < max(1.0, host.latency or 0):
+            return
+        host.last_decrease = now
+        host.rate = max(self.min_rate, host.rate * self.decrease)
+        host.concurrency = max(1.0, host.concurrency * self.decrease)
+        host.tokens = min(host.tokens, 0.0)
+        host.stats['backoffs'] += 1
+
+    @contextmanager
+    def request(self, url, browser=False):
+        """acquire() and release() around a block; an exception in the block counts as an error"""
+        self.acquire(url)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.release(url, time.perf_counter() - start, error=True, browser=browser)
+            raise
+        self.release(url, time.perf_counter() - start, browser=browser)
+
+    def to_dict(self):
+        """Current pace and counters per host"""
+        with self._lock:
+            return {key: {'rate': round(host.rate, 3), 'concurrency': int(host.concurrency),
+                          'in_flight': host.in_flight,
+                          'latency': round(host.latency, 3) if host.latency is not None else None,
+                          **{name: round(value, 3) if isinstance(value, float) else value
+                             for name, value in host.stats.items()}}
+                    for key, host in self._hosts.items()}
+
+    def report(self):
+        hosts = self.to_dict()
+        if not hosts:
+            return
+        print("\n🚦 Politeness:")
+        for key, host in hosts.items():
+            latency = f", avg {host['latency'] * 1000:.0f} ms" if host['latency'] is not None else ""
+            print(f"  {key}: {host['rate']:.2f} req/s now ({host['min_rate']:.2f}-{host['max_rate']:.2f}), "
+                  f"{host['concurrency']} in flight max{latency}")
+            print(f"    {host['requests']} requests, {host['throttled']} throttled, {host['errors']} errors, "
+                  f"{host['slow']} slow, {host['backoffs']} backoffs, waited {host['waited']:.1f}s")
+
+
+def paced(scheduler, url, browser=False):
+    """scheduler.request(url, browser), or nothing when there is no scheduler"""
+    return scheduler.request(url, browser) if scheduler is not None else nullcontext()
@@ -1,62 +1,89 @@
+import argparse
 import json
 import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.options import Options
 import re
+from page_waits import PageWaiter
+from browser import create_driver, DriverWatchdog, TrafficMeter
+from crawl_metrics import CrawlMetrics
+from crawl_state import CrawlCheckpoint, dedupe_product_urls
+from static_parser import extract_product_details
+from work_queue import LeaseLost
+from politeness import paced
+
+# Accordion headers of the 기술 정보 items
+SECTION_HEADER_SELECTORS = [
+    "[class*='accordion__item-header']",
+    "button[class*='accordion']",
+    "button[class*='vp-accordion']",
+    "button[id*='accordion']"
+]
+# Section headings (h2) we extract from: only these are opened, other h2s are never clicked
+SECTION_TITLES = ['설명', '특징', '구성', '추천', '기술 정보', '관리']
+
 
 class DecathlonTrulyFinalCrawler:
     
-    def __init__(self, debug=True):
+    def __init__(self, debug=True, snapshot_cache=None, replay=False, parser='selenium', lean=False, store=None,
+                 driver=None, watchdog=None, politeness=None):
         self.debug = debug
-        options = Options() 
-        if not debug:
-            options.add_argument('--headless')
-        options.add_argument('--start-maximized')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        self.lean = lean
+        self.store = store  # Optional SqliteStore: products are upserted into product_details
+        self.parser = parser  # 'html': one page_source dump parsed with lxml instead of per-element Selenium calls
+        self.snapshot_cache = snapshot_cache  # Optional PageSnapshotCache for the expanded page HTML
+        self.replay = replay  # Re-extract from snapshot_cache only: no browser, no network
+        self.politeness = politeness  # Optional PolitenessScheduler: paced page loads instead of 3s per product
+        self.driver = None
+        self.traffic = TrafficMeter(None)
+        self.metrics = CrawlMetrics('product_info')  # Per-phase timing spans, per product and per run
+        self.watchdog = None  # Optional DriverWatchdog (only for a browser we started ourselves)
+        self.last_error = None  # Exception of the last failed extract_product_info
+        if replay:
+            self.waiter = PageWaiter(None, timeout=20)
+            return
         
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.maximize_window()
+        # lean=True blocks images/media/fonts/trackers and loads pages eagerly
+        self.owns_driver = driver is None  # A driver passed in (unified pipeline) is quit by its owner
+        self.driver = driver if driver is not None else create_driver(headless=not debug, lean=lean)
+        self.traffic.driver = self.driver
         self.wait = WebDriverWait(self.driver, 20)
+        self.waiter = PageWaiter(self.driver, timeout=20)
+        if self.owns_driver and watchdog is not None:
+            self.watchdog = watchdog
+            watchdog.attach(self.driver)
+    
+    def restart_driver(self, reason):
+        """Replace Chrome with a fresh one (the next product is opened on it)"""
+        print(f"🔄 Restarting Chrome ({reason}, {self.watchdog.pages} pages on this session)")
+        with self.metrics.span('driver_restart'):
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"⚠️ Old browser did not quit cleanly: {e}")
+            self.watchdog.restarted(reason)
+            self.metrics.count('driver_restarts')
+            self.driver = create_driver(headless=not self.debug, lean=self.lean)
+            self.traffic.driver = self.driver
+            self.wait = WebDriverWait(self.driver, 20)
+            self.waiter.driver = self.driver
+            self.watchdog.attach(self.driver)
         
-    def extract_product_info(self, url):
+    def extract_product_info(self, url, navigate=True):
+        """navigate=False extracts from the page already open in the browser"""
+        self.last_error = None
         try:
             print(f"\n{'='*80}")
             print(f"Crawling: {url}")
             print(f"{'='*80}")
             
-            self.driver.get(url)
-            time.sleep(5)
-            
-            product_data = {
-                "상품ID": "",
-                "상품명": "",
-                "브랜드": "",
-                "설명": "",
-                "특징 및 장점": "",
-                "기술 정보": "",
-                "구성/추천": "",
-                "관리 지침": "",
-                "URL": url
-            }
-            
-            # Basic info
-            product_data.update(self._extract_basic_info())
-            
-            # Expand EVERYTHING
-            print("→ Expanding all sections aggressively...")
-            self._super_expand()
-            
-            # Extract
-            print("→ Extracting content...")
-            product_data['설명'] = self._extract_description()
-            product_data['특징 및 장점'] = self._extract_features_from_benefits()
-            product_data['기술 정보'] = self._extract_technical_info()
-            product_data['구성/추천'] = self._extract_composition()
-            product_data['관리 지침'] = self._extract_care()
+            if self.replay:
+                with self.metrics.span('snapshot_extract'):
+                    product_data = self._extract_from_snapshot(url)
+                if product_data is None:
+                    return None
+            else:
+                product_data = self._extract_live(url, navigate)
             
             # Results
             if self.debug:
@@ -72,78 +99,94 @@ class DecathlonTrulyFinalCrawler:
             return product_data
             
         except Exception as e:
+            self.last_error = e
             print(f"❌ Error: {e}")
             if self.debug:
                 import traceback
                 traceback.print_exc()
             return None
     
+    def _extract_from_snapshot(self, url):
+        """Run the static extractors on the cached expanded page"""
+        page_html = self.snapshot_cache.get('product', url)
+        if page_html is None:
+            print("⚠️ Not in the snapshot cache")
+            return None
+        return extract_product_details(page_html, url)
+    
+    def _extract_live(self, url, navigate=True):
+        """Render, expand and extract one product page in the browser"""
+        if navigate:
+            with self.metrics.span('navigation'), paced(self.politeness, url, browser=True):
+                self.driver.get(url)
+                self.waiter.page_ready()
+                self.waiter.any_element('product_ready', ['h1'])
+        
+        product_data = {
+            "상품ID": "",
+            "상품명": "",
+            "브랜드": "",
+            "설명": "",
+            "특징 및 장점": "",
+            "기술 정보": "",
+            "구성/추천": "",
+            "관리 지침": "",
+            "URL": url
+        }
+        
+        if self.parser == 'html':
+            print("→ Expanding all sections aggressively...")
+            with self.metrics.span('expansion'):
+                self._super_expand()
+            self.traffic.record()
+            print("→ Extracting content from page source...")
+            with self.metrics.span('page_source'):
+                page_html = self.driver.page_source
+            if self.snapshot_cache is not None:
+                with self.metrics.span('snapshot'):
+                    self.snapshot_cache.put('product', url, 1, page_html)
+            with self.metrics.span('static_extract'):
+                return extract_product_details(page_html, url)
+        
+        # Basic info
+        with self.metrics.span('basic_info'):
+            product_data.update(self._extract_basic_info())
+        
+        # Expand EVERYTHING
+        print("→ Expanding all sections aggressively...")
+        with self.metrics.span('expansion'):
+            self._super_expand()
+        self.traffic.record()
+        
+        # Extract
+        print("→ Extracting content...")
+        with self.metrics.span('description'):
+            product_data['설명'] = self._extract_description()
+        with self.metrics.span('features'):
+            product_data['특징 및 장점'] = self._extract_features_from_benefits()
+        with self.metrics.span('technical_info'):
+            product_data['기술 정보'] = self._extract_technical_info()
+        with self.metrics.span('composition'):
+            product_data['구성/추천'] = self._extract_composition()
+        with self.metrics.span('care'):
+            product_data['관리 지침'] = self._extract_care()
+        
+        if self.snapshot_cache is not None:
+            with self.metrics.span('snapshot'):
+                self.snapshot_cache.put('product', url, 1, self.driver.page_source)
+        return product_data
+    
     def _super_expand(self):
-        """SUPER AGGRESSIVE expansion - click EVERYTHING"""
-        try:
-            # Scroll to content
-            self.driver.execute_script("window.scrollTo(0, 1000);")
-            time.sleep(2)
-            
-            # Click all accordion buttons (for 기술 정보)
-            accordion_selectors = [
-                "button[class*='accordion']",
-                "button[class*='vp-accordion']",
-                "[class*='accordion__item-header']",
-                "button[id*='accordion']"
-            ]
-            
-            for selector in accordion_selectors:
-                try:
-                    buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if self.debug:
-                        print(f"  Found {len(buttons)} buttons with selector: {selector}")
-                    for btn in buttons:
-                        try:
-                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
-                            time.sleep(0.2)
-                            self.driver.execute_script("arguments[0].click();", btn)
-                            time.sleep(0.3)
-                        except:
-                            pass
-                except:
-                    pass
-            
-            # Click all h2 tags
-            h2s = self.driver.find_elements(By.TAG_NAME, 'h2')
-            for h2 in h2s:
-                try:
-                    self.driver.execute_script("arguments[0].click();", h2)
-                    time.sleep(0.2)
-                except:
-                    pass
-            
-            # Click all buttons
-            buttons = self.driver.find_elements(By.TAG_NAME, 'button')
-            if self.debug:
-                print(f"  Clicking {len(buttons)} total buttons...")
-            for btn in buttons[:100]:  # Limit to first 100
-                try:
-                    self.driver.execute_script("arguments[0].click();", btn)
-                    time.sleep(0.15)
-                except:
-                    pass
-            
-            # Full page scroll
-            time.sleep(3)
-            height = self.driver.execute_script("return document.body.scrollHeight")
-            for i in range(0, height, 400):
-                self.driver.execute_script(f"window.scrollTo(0, {i});")
-                time.sleep(0.1)
-            
-            self.driver.execute_script("window.scrollTo(0, 1000);")
-            time.sleep(3)
-            
-            print("  ✓ Super expansion complete")
-            
-        except Exception as e:
+        """Open the sections we extract from (accordions, section headers) in one in-page call"""
+        result = self.waiter.expand_sections(SECTION_HEADER_SELECTORS, SECTION_TITLES,
+                                             quiet_ms=400, timeout=10)
+        if result is None:
             if self.debug:
-                print(f"  ⚠️ Expansion error: {e}")
+                print("  ⚠️ Expansion error")
+            return
+        state = "settled" if result['quiet'] else "timed out"
+        print(f"  ✓ Opened {result['opened']}/{result['candidates']} sections, "
+              f"{state} after {result['elapsed'] / 1000:.2f}s ({result['mutations']} mutations)")
     
     def _extract_description(self):
         """Extract 설명"""
@@ -378,21 +421,74 @@ class DecathlonTrulyFinalCrawler:
         
         return info
     
-    def crawl_products(self, urls, output='data/products_korean.json'):
-        """Crawl and save"""
+    def crawl_product(self, url):
+        """extract_product_info under the watchdog: a fresh browser after N products or above the
+        memory limit, and one retry on a new browser when the old one hung"""
+        if self.watchdog is None:
+            return self.extract_product_info(url)
+        reason = self.watchdog.check()
+        if reason:
+            self.restart_driver(reason)
+        start = time.perf_counter()
+        data = self.extract_product_info(url)
+        if data is None and self.last_error is not None and self.watchdog.is_hang(self.last_error):
+            self.restart_driver('hang')
+            start = time.perf_counter()
+            data = self.extract_product_info(url)
+        self.watchdog.record_page(time.perf_counter() - start)
+        return data
+    
+    def crawl_products(self, urls, output='data/products_korean.json', checkpoint_path=None, resume=False,
+                       work_queue=None):
+        """Crawl and save (with checkpoint_path, finished products survive a crash; resume=True skips them).
+        With a shared work_queue (WorkQueue(..., name='product_info')) several processes or machines
+        split the URLs; output then holds this process's products and the queue holds all of them"""
+        urls = dedupe_product_urls(urls)
         products = []
+        checkpoint = CrawlCheckpoint(checkpoint_path, resume) if checkpoint_path else None
+        if checkpoint:
+            products = [p['summary'] for _, p in checkpoint.completed() if p['summary']]
+        start = time.perf_counter()
         
-        for i, url in enumerate(urls, 1):
-            print(f"\n{'#'*80}")
-            print(f"[{i}/{len(urls)}]")
-            print(f"{'#'*80}")
-            
-            data = self.extract_product_info(url)
-            if data:
-                products.append(data)
-            
-            if i < len(urls):
-                time.sleep(3)
+        jobs = urls
+        if work_queue is not None:
+            print(f"📥 {work_queue.enqueue(urls)} new product URLs queued in {work_queue.path}")
+            jobs = (url for (url,) in work_queue.leases())
+        
+        try:
+            for i, url in enumerate(jobs, 1):
+                if checkpoint and work_queue is None and checkpoint.is_done(url):
+                    continue
+                
+                print(f"\n{'#'*80}")
+                print(f"[{i}/{len(urls)}]")
+                print(f"{'#'*80}")
+                
+                with self.metrics.product(url):
+                    data = self.crawl_product(url)
+                if data and work_queue is not None:
+                    try:
+                        work_queue.complete(url, data)
+                    except LeaseLost as e:
+                        print(f"⚠️ {e}; the worker that took it over commits it instead")
+                        data = None
+                if data:
+                    products.append(data)
+                    if self.store is not None:
+                        self.store.upsert_product_details(data)
+                    if checkpoint:
+                        checkpoint.product_done(url, data)
+                
+                if i < len(urls) and not self.replay and self.politeness is None:
+                    time.sleep(3)
+        finally:
+            if checkpoint:
+                checkpoint.close()
+            if work_queue is not None:
+                work_queue.report()
+        
+        if self.replay:
+            print(f"\n⏱️ Re-extracted {len(products)} products from snapshots in {time.perf_counter() - start:.2f}s")
         
         if products:
             import os
@@ -406,14 +502,32 @@ class DecathlonTrulyFinalCrawler:
             for field in ['설명', '특징 및 장점', '기술 정보', '구성/추천', '관리 지침']:
                 count = sum(1 for p in products if p.get(field))
                 print(f"  {field}: {count}/{len(products)}")
+            self.waiter.report()
+            self.traffic.report()
+            if self.watchdog is not None:
+                self.watchdog.report()
+            if self.politeness is not None:
+                self.politeness.report()
+            self.metrics.count('products', len(products))
+            self.metrics.report()
+            base = os.path.splitext(output)[0]
+            self.metrics.write_json(f"{base}_metrics.json")
+            self.metrics.write_prometheus(f"{base}_metrics.prom")
         
         return products
     
     def close(self):
-        self.driver.quit()
+        if self.driver is not None and self.owns_driver:
+            self.driver.quit()
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Crawl Decathlon Korea product details')
+    parser.add_argument('--lean', action='store_true', help='Block images, fonts, video and trackers')
+    parser.add_argument('--watchdog', action='store_true',
+                        help='Restart Chrome every 150 products, above 1.5 GB or when a command hangs')
+    args = parser.parse_args()
+    
     URLS = [
         
 "https://www.decathlon.co.kr/p/여성-러닝-윈드-베스트-런-500-kiprun-8928640.html",
@@ -493,9 +607,12 @@ def main():
 ╚══════════════════════════════════════════════════════════╝
     """)
     
-    crawler = DecathlonTrulyFinalCrawler(debug=True)
+    # Every product page is expanded in full, so the watchdog replaces Chrome more often than for reviews
+    watchdog = DriverWatchdog(max_pages=150, max_rss_mb=1500) if args.watchdog else None
+    crawler = DecathlonTrulyFinalCrawler(debug=True, lean=args.lean, watchdog=watchdog)
     
     try:
+        # Pass checkpoint_path='data/review_info_checkpoint.jsonl', resume=True to continue a crashed run
         crawler.crawl_products(URLS)
     finally:
         crawler.close()
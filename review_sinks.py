@@ -0,0 +1,102 @@
+"""
+Review sinks for DecathlonReviewScraper
+
+The scraper hands every parsed page of reviews to a sink instead of keeping
+all of them in memory. MemorySink keeps the old behaviour (a list that is
+written out at the end); CsvReviewSink streams rows to complete.csv in
+batches and fsyncs at product boundaries, so memory stays flat however many
+reviews are collected.
+"""
+
+import csv
+import os
+import threading
+from crawl_state import detect_delimiter
+
+REVIEW_FIELDS = ['product_id', 'product_name', 'category', 'subcategory', 'brand',
+                 'rating', 'review_text', 'sentiment', 'date']
+
+
+class MemorySink:
+    """Keeps every row in a list (what save_complete_csv writes at the end)"""
+    persistent = False
+    keeps_previous = False  # Starts empty: rows restored from a checkpoint must be written again
+
+    def __init__(self, rows=None):
+        self.rows = rows if rows is not None else []
+        self.name = 'memory'
+        self._lock = threading.Lock()
+
+    @property
+    def count(self):
+        return len(self.rows)
+
+    def write_rows(self, rows):
+        with self._lock:
+            self.rows.extend(rows)
+
+    def flush(self):
+        pass
+
+    def end_product(self, summary=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class CsvReviewSink:
+    """Streams rows to a CSV file in batches; fsync at every product boundary"""
+    persistent = True
+
+    def __init__(self, filename='complete.csv', batch_size=200, append=False, delimiter=','):
+        """append=True keeps an existing file (incremental runs, resuming); otherwise it is replaced"""
+        self.name = filename
+        self.batch_size = batch_size
+        self.count = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+
+        exists = os.path.exists(filename) and os.path.getsize(filename) > 0
+        # Whether the rows of the previous run are still in the file
+        self.keeps_previous = append and exists
+        if append and exists:
+            # Keep the existing file's format; no BOM in the middle of the file
+            delimiter = detect_delimiter(filename)
+            self._file = open(filename, 'a', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=REVIEW_FIELDS, delimiter=delimiter)
+        else:
+            self._file = open(filename, 'w', newline='', encoding='utf-8-sig')
+            self._writer = csv.DictWriter(self._file, fieldnames=REVIEW_FIELDS, delimiter=delimiter)
+            self._writer.writeheader()
+
+    def write_rows(self, rows):
+        with self._lock:
+            self._buffer.extend(rows)
+            self.count += len(rows)
+            if len(self._buffer) >= self.batch_size:
+                self._write_buffer()
+
+    def _write_buffer(self):
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+
+    def flush(self):
+        """Hand buffered rows to the OS (before a page is checkpointed)"""
+        with self._lock:
+            self._write_buffer()
+
+    def end_product(self, summary=None):
+        """Make everything written so far durable"""
+        with self._lock:
+            self._write_buffer()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._write_buffer()
+                os.fsync(self._file.fileno())
+                self._file.close()
@@ -0,0 +1,207 @@
+"""
+Review sentiment classification
+
+The lexicon is compiled once into one regular expression per polarity, and
+classify_many works on whole columns: the rating decides most reviews, and
+only the 2.5 < rating < 4.5 band is scanned for keywords. Because the
+complete.csv rows keep rating and text, a changed lexicon can be applied to
+existing output without re-crawling:
+
+    python sentiment.py complete.csv --summary summary.csv
+    python sentiment.py data/decathlon.db
+
+Rows in complete.csv keep only the first 200 characters of each review, so a
+keyword past that point (seen during the crawl) is not seen here.
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import sqlite3
+import time
+from crawl_state import ReviewDedupIndex, detect_delimiter
+
+NEGATIVE_WORDS = ['별로', '실망', '안좋', '나쁘', '최악', '환불', '불만']
+POSITIVE_WORDS = ['좋', '만족', '추천', '최고', '훌륭', '완벽']
+
+POSITIVE_RATING = 4.5  # At or above: positive whatever the text says
+NEGATIVE_RATING = 2.5  # At or below: negative
+
+
+def compile_lexicon(words):
+    """One alternation for the whole word list: a single scan per text instead of one per word"""
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+NEGATIVE_RE = compile_lexicon(NEGATIVE_WORDS)
+POSITIVE_RE = compile_lexicon(POSITIVE_WORDS)
+
+
+def classify_sentiment(review_text, rating):
+    if rating >= POSITIVE_RATING:
+        return 'positive'
+    elif rating <= NEGATIVE_RATING:
+        return 'negative'
+    # A negative keyword without a positive one is negative; everything else is mixed
+    if NEGATIVE_RE.search(review_text) and not POSITIVE_RE.search(review_text):
+        return 'negative'
+    return 'mixed'
+
+
+def classify_many(texts, ratings):
+    """Sentiments for two parallel columns (review texts and float ratings)"""
+    negative_search = NEGATIVE_RE.search
+    positive_search = POSITIVE_RE.search
+    return ['positive' if rating >= POSITIVE_RATING else
+            'negative' if rating <= NEGATIVE_RATING else
+            'negative' if negative_search(text) and not positive_search(text) else
+            'mixed'
+            for text, rating in zip(texts, ratings)]
+
+
+def _rating(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 5.0  # What the crawler stores when no rating was found
+
+
+def _file_format(filename):
+    """Encoding, line ending, quoting and final newline, to write the file back the way it was"""
+    with open(filename, 'rb') as f:
+        header = f.readline()
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 1))
+        last = f.read(1)
+    bom = header.startswith(b'\xef\xbb\xbf')
+    return {'encoding': 'utf-8-sig' if bom else 'utf-8',
+            'lineterminator': '\r\n' if header.endswith(b'\r\n') else '\n',
+            # Header names never need quotes, so a quoted header means every field was quoted
+            'quoting': csv.QUOTE_ALL if header[3 if bom else 0:].startswith(b'"') else csv.QUOTE_MINIMAL,
+            'final_newline': last in (b'\n', b'\r')}
+
+
+def _write_back(filename, text, file_format):
+    """Replace the file with text (written by a csv writer in file_format) atomically"""
+    if not file_format['final_newline']:
+        text = text[:-len(file_format['lineterminator'])]
+    tmp_path = f"{filename}.tmp"
+    with open(tmp_path, 'w', newline='', encoding=file_format['encoding']) as f:
+        f.write(text)
+    os.replace(tmp_path, filename)
+
+
+def reclassify_csv(filename):
+    """Re-classify complete.csv in place. Returns ({product_id: count changes}, rows, changed rows).
+    Repeated rows of the same review (older runs appended duplicates) change the counts once.
+    Nothing is written when no row changed"""
+    delimiter = detect_delimiter(filename)
+    file_format = _file_format(filename)
+    with open(filename, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader)
+        rows = list(reader)
+    product_col, rating_col = header.index('product_id'), header.index('rating')
+    text_col, sentiment_col = header.index('review_text'), header.index('sentiment')
+
+    sentiments = classify_many([row[text_col] for row in rows],
+                               [_rating(row[rating_col]) for row in rows])
+    deltas = {}
+    seen = set()
+    changed = 0
+    for row, sentiment in zip(rows, sentiments):
+        previous = row[sentiment_col]
+        if previous == sentiment:
+            continue
+        row[sentiment_col] = sentiment
+        changed += 1
+        key = ReviewDedupIndex.key(dict(zip(header, row)))
+        if key in seen:
+            continue
+        seen.add(key)
+        product_deltas = deltas.setdefault(row[product_col], {})
+        product_deltas[previous] = product_deltas.get(previous, 0) - 1
+        product_deltas[sentiment] = product_deltas.get(sentiment, 0) + 1
+
+    if not changed:
+        return deltas, len(rows), 0  # Leave the file (and its mtime) alone
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator=file_format['lineterminator'],
+                        quoting=file_format['quoting'])
+    writer.writerow(header)
+    writer.writerows(rows)
+    _write_back(filename, buffer.getvalue(), file_format)
+    return deltas, len(rows), changed
+
+
+def update_summary_csv(filename, deltas):
+    """Apply the count changes from reclassify_csv to summary.csv. Only reviews that moved
+    are counted, so totals from reviews no longer in complete.csv stay as they were"""
+    delimiter = detect_delimiter(filename)
+    file_format = _file_format(filename)
+    with open(filename, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        fieldnames = reader.fieldnames
+        records = list(reader)
+    updated = 0
+    for record in records:
+        product_deltas = deltas.get(record['product_id'])
+        if not product_deltas:
+            continue
+        for sentiment, n in product_deltas.items():
+            column = f'{sentiment}_reviews'
+            if column in record:
+                record[column] = max(0, int(record[column] or 0) + n)
+        updated += 1
+
+    if not updated:
+        return 0
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, delimiter=delimiter,
+                            lineterminator=file_format['lineterminator'], quoting=file_format['quoting'])
+    writer.writeheader()
+    writer.writerows(records)
+    _write_back(filename, buffer.getvalue(), file_format)
+    return updated
+
+
+def reclassify_sqlite(path):
+    """Re-classify the reviews table of a SqliteStore database (product_summary follows)"""
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute('SELECT review_key, rating, review_text, sentiment FROM reviews').fetchall()
+        sentiments = classify_many([row[2] or '' for row in rows], [_rating(row[1]) for row in rows])
+        changes = [(sentiment, row[0]) for row, sentiment in zip(rows, sentiments) if row[3] != sentiment]
+        with conn:
+            conn.executemany('UPDATE reviews SET sentiment = ? WHERE review_key = ?', changes)
+        return len(rows), len(changes)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-classify review sentiment with the current lexicon')
+    parser.add_argument('reviews', help='complete.csv, or a SqliteStore .db file')
+    parser.add_argument('--summary', help='summary.csv whose sentiment counts are regenerated')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.reviews.endswith(('.db', '.sqlite', '.sqlite3')):
+        total, changed = reclassify_sqlite(args.reviews)
+    else:
+        deltas, total, changed = reclassify_csv(args.reviews)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Re-classified {total} reviews in {elapsed:.1f}s ({changed} changed): {args.reviews}")
+
+    if args.summary:
+        if args.reviews.endswith(('.db', '.sqlite', '.sqlite3')):
+            print("⚠️ --summary is for CSV output; the database's product_summary view is already up to date")
+        else:
+            updated = update_summary_csv(args.summary, deltas)
+            print(f"✅ Updated sentiment counts of {updated} products in {args.summary}")
+
+
+if __name__ == "__main__":
+    main()
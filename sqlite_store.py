@@ -0,0 +1,249 @@
+"""
+SQLite storage for both crawlers
+
+One embedded database instead of complete.csv/summary.csv/products_korean.json:
+products, reviews and product_details tables with upserts, so a re-run updates
+rows in place. Each page of reviews is written in one transaction. The
+summary.csv numbers are the product_summary view:
+
+    SELECT * FROM product_summary WHERE brand = 'KIPRUN' ORDER BY avg_rating DESC;
+    SELECT date, COUNT(*) FROM reviews WHERE product_id = '8759614' AND date >= '2025-06-01' GROUP BY date;
+
+Import existing CSV output with:
+
+    python sqlite_store.py data/decathlon.db --import complete.csv --summary summary.csv
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from crawl_state import ReviewDedupIndex, detect_delimiter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id    TEXT PRIMARY KEY,
+    product_name  TEXT,
+    category      TEXT,
+    subcategory   TEXT,
+    brand         TEXT,
+    price         INTEGER,
+    url           TEXT,
+    thumbnail_url TEXT,
+    updated_at    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_products_brand ON products (brand);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    review_key  TEXT PRIMARY KEY,  -- product_id|date|content hash (ReviewDedupIndex.key)
+    product_id  TEXT NOT NULL,
+    rating      REAL,
+    review_text TEXT,
+    sentiment   TEXT,
+    date        TEXT,
+    first_seen  TEXT,
+    last_seen   TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_product_date ON reviews (product_id, date);
+CREATE INDEX IF NOT EXISTS idx_reviews_date ON reviews (date);
+
+CREATE TABLE IF NOT EXISTS product_details (
+    product_id     TEXT PRIMARY KEY,
+    product_name   TEXT,
+    brand          TEXT,
+    description    TEXT,
+    features       TEXT,
+    technical_info TEXT,
+    composition    TEXT,
+    care           TEXT,
+    url            TEXT,
+    updated_at     TEXT
+);
+
+CREATE VIEW IF NOT EXISTS product_summary AS
+SELECT p.product_id, p.product_name, p.category, p.subcategory, p.brand, p.price,
+       COALESCE(ROUND(AVG(r.rating), 1), 0.0) AS avg_rating,
+       COUNT(r.review_key) AS total_reviews,
+       COALESCE(SUM(r.sentiment = 'positive'), 0) AS positive_reviews,
+       COALESCE(SUM(r.sentiment = 'mixed'), 0) AS mixed_reviews,
+       COALESCE(SUM(r.sentiment = 'negative'), 0) AS negative_reviews,
+       p.url, p.thumbnail_url
+FROM products p LEFT JOIN reviews r ON r.product_id = p.product_id
+GROUP BY p.product_id;
+"""
+
+SUMMARY_FIELDS = ['product_id', 'product_name', 'category', 'subcategory', 'brand',
+                  'price', 'avg_rating', 'total_reviews', 'positive_reviews',
+                  'mixed_reviews', 'negative_reviews', 'url', 'thumbnail_url']
+
+# product_data keys of DecathlonTrulyFinalCrawler -> product_details columns
+DETAIL_COLUMNS = {
+    '상품ID': 'product_id', '상품명': 'product_name', '브랜드': 'brand', '설명': 'description',
+    '특징 및 장점': 'features', '기술 정보': 'technical_info', '구성/추천': 'composition',
+    '관리 지침': 'care', 'URL': 'url'
+}
+
+UPSERT_PRODUCT = """
+INSERT INTO products (product_id, product_name, category, subcategory, brand, price, url, thumbnail_url, updated_at)
+VALUES (:product_id, :product_name, :category, :subcategory, :brand, :price, :url, :thumbnail_url, :updated_at)
+ON CONFLICT (product_id) DO UPDATE SET
+    product_name = excluded.product_name, category = excluded.category,
+    subcategory = excluded.subcategory, brand = excluded.brand,
+    price = COALESCE(excluded.price, products.price), url = COALESCE(excluded.url, products.url),
+    thumbnail_url = COALESCE(excluded.thumbnail_url, products.thumbnail_url),
+    updated_at = excluded.updated_at
+"""
+
+UPSERT_REVIEW = """
+INSERT INTO reviews (review_key, product_id, rating, review_text, sentiment, date, first_seen, last_seen)
+VALUES (:review_key, :product_id, :rating, :review_text, :sentiment, :date, :seen, :seen)
+ON CONFLICT (review_key) DO UPDATE SET
+    rating = excluded.rating, sentiment = excluded.sentiment, last_seen = excluded.last_seen
+"""
+
+UPSERT_DETAILS = """
+INSERT INTO product_details (product_id, product_name, brand, description, features, technical_info,
+                             composition, care, url, updated_at)
+VALUES (:product_id, :product_name, :brand, :description, :features, :technical_info,
+        :composition, :care, :url, :updated_at)
+ON CONFLICT (product_id) DO UPDATE SET
+    product_name = excluded.product_name, brand = excluded.brand, description = excluded.description,
+    features = excluded.features, technical_info = excluded.technical_info,
+    composition = excluded.composition, care = excluded.care, url = excluded.url,
+    updated_at = excluded.updated_at
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class SqliteStore:
+    """Review sink and product store backed by one SQLite file"""
+    persistent = True
+    keeps_previous = True  # Rows of earlier runs stay in the database
+
+    def __init__(self, path='data/decathlon.db'):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.name = path
+        self.count = 0
+        self._lock = threading.Lock()  # One connection shared by parallel workers
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def _product_rows(self, rows):
+        """Product columns carried on review rows (price/url come with end_product)"""
+        products = {}
+        for review_data in rows:
+            products[str(review_data['product_id'])] = {
+                'product_id': str(review_data['product_id']),
+                'product_name': review_data['product_name'],
+                'category': review_data['category'],
+                'subcategory': review_data['subcategory'],
+                'brand': review_data['brand'],
+                'price': None, 'url': None, 'thumbnail_url': None,
+                'updated_at': _now()
+            }
+        return list(products.values())
+
+    def write_rows(self, rows):
+        """Upsert one page of reviews in a single transaction"""
+        if not rows:
+            return
+        seen = _now()
+        reviews = [{
+            'review_key': ReviewDedupIndex.key(review_data),
+            'product_id': str(review_data['product_id']),
+            'rating': float(review_data['rating']) if review_data['rating'] not in (None, '') else None,
+            'review_text': review_data['review_text'],
+            'sentiment': review_data['sentiment'],
+            'date': review_data['date'] if review_data['date'] != 'Unknown' else None,
+            'seen': seen
+        } for review_data in rows]
+        with self._lock, self.conn:
+            self.conn.executemany(UPSERT_PRODUCT, self._product_rows(rows))
+            self.conn.executemany(UPSERT_REVIEW, reviews)
+        self.count += len(rows)
+
+    def flush(self):
+        pass  # Every page is committed by write_rows
+
+    def end_product(self, summary=None):
+        """Store the product's price, URL and thumbnail"""
+        if summary:
+            self.upsert_product(summary)
+
+    def upsert_product(self, summary):
+        product = {key: summary.get(key) for key in
+                   ('product_name', 'category', 'subcategory', 'brand', 'price', 'url', 'thumbnail_url')}
+        product['product_id'] = str(summary['product_id'])
+        product['updated_at'] = _now()
+        with self._lock, self.conn:
+            self.conn.execute(UPSERT_PRODUCT, product)
+
+    def upsert_product_details(self, product_data):
+        """Store one DecathlonTrulyFinalCrawler product_data dict"""
+        details = {column: product_data.get(key, '') for key, column in DETAIL_COLUMNS.items()}
+        details['updated_at'] = _now()
+        with self._lock, self.conn:
+            self.conn.execute(UPSERT_DETAILS, details)
+
+    def summary(self):
+        """The product_summary view as dicts (same columns as summary.csv)"""
+        with self._lock:
+            return [dict(row) for row in self.conn.execute('SELECT * FROM product_summary ORDER BY product_id')]
+
+    def export_summary_csv(self, filename='summary.csv'):
+        records = self.summary()
+        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        print(f"✅ Saved {len(records)} product summaries to {filename}")
+
+    def import_csv(self, complete_csv, summary_csv=None):
+        """Load existing complete.csv (and summary.csv for prices/URLs) into the database"""
+        with open(complete_csv, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f, delimiter=detect_delimiter(complete_csv)))
+        self.write_rows(rows)
+        if summary_csv:
+            with open(summary_csv, newline='', encoding='utf-8-sig') as f:
+                for row in csv.DictReader(f, delimiter=detect_delimiter(summary_csv)):
+                    row['price'] = int(row['price']) if row['price'] else None
+                    row['thumbnail_url'] = row['thumbnail_url'] or None
+                    self.upsert_product(row)
+        print(f"✅ Imported {len(rows)} reviews from {complete_csv} into {self.name}")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import CSV output into SQLite or export the summary view')
+    parser.add_argument('database')
+    parser.add_argument('--import', dest='complete', help='complete.csv to import')
+    parser.add_argument('--summary', help='summary.csv to import prices/URLs/thumbnails from')
+    parser.add_argument('--export-summary', help='Write the product_summary view to this CSV')
+    args = parser.parse_args()
+
+    store = SqliteStore(args.database)
+    try:
+        if args.complete:
+            store.import_csv(args.complete, args.summary)
+        if args.export_summary:
+            store.export_summary_csv(args.export_summary)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+Browserless extraction from saved or fetched Decathlon page HTML
+
+Mirrors what DecathlonReviewScraper reads through Selenium (price, thumbnail,
+review blocks, next-page button) so a page can be parsed without a browser.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from lxml import html as lxml_html
+
+REVIEW_XPATH = '//*[contains(text(), "대한민국")]'
+
+# Same order as the CSS selectors used by the Selenium path
+PRICE_XPATHS = [
+    '//*[contains(@data-testid, "price")]',
+    '//*[contains(concat(" ", normalize-space(@class), " "), " product-price ")]',
+    '//*[contains(@class, "price")]',
+    '//span[contains(@class, "Price")]',
+    '//div[contains(@class, "price")]'
+]
+
+THUMBNAIL_XPATHS = [
+    '//img[contains(@alt, "제품")]',
+    '//img[contains(@class, "product")]',
+    '//img[contains(@class, "Product")]',
+    '//*[contains(concat(" ", normalize-space(@class), " "), " product-image ")]//img',
+    '//*[contains(@data-testid, "image")]//img',
+    '//img[contains(@src, "product")]'
+]
+
+NEXT_PAGE_XPATHS = [
+    '//button[@data-testid="next-page"]',
+    '//button[@aria-label="Next page"]',
+    '//a[@rel="next"]'
+]
+
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'td', 'th', 'tr', 'ul'
+}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'head'}
+
+
+def parse_html(page_html):
+    return lxml_html.fromstring(page_html)
+
+
+def inner_text(element):
+    """Approximate the browser's innerText: one line per block element"""
+    chunks = []
+
+    def walk(node):
+        tag = node.tag if isinstance(node.tag, str) else None
+        if tag is None or tag in SKIP_TAGS:
+            return
+        block = tag in BLOCK_TAGS
+        if block:
+            chunks.append('\n')
+        if node.text:
+            chunks.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                chunks.append(child.tail)
+        if block:
+            chunks.append('\n')
+
+    walk(element)
+    lines = [re.sub(r'\s+', ' ', line).strip() for line in ''.join(chunks).split('\n')]
+    return '\n'.join(line for line in lines if line)
+
+
+def extract_price(tree):
+    for xpath in PRICE_XPATHS:
+        matches = tree.xpath(xpath)
+        if not matches:
+            continue
+        # Like find_element: only the first match of each selector is considered
+        price_text = inner_text(matches[0])
+        if price_text and any(char.isdigit() for char in price_text):
+            price = int(re.sub(r'[^\d]', '', price_text))
+            if price > 0:
+                return price
+
+    for script in tree.xpath('//script[@type="application/ld+json"]/text()'):
+        match = re.search(r'"price"\s*:\s*"?(\d+)', script)
+        if match and int(match.group(1)) > 0:
+            return int(match.group(1))
+
+    for elem in tree.xpath('//*[contains(text(), "원") and contains(text(), ",")]'):
+        digits = re.sub(r'[^\d]', '', inner_text(elem))
+        if digits and int(digits) > 1000:
+            return int(digits)
+    return None
+
+
+def extract_thumbnail(tree):
+    for xpath in THUMBNAIL_XPATHS:
+        matches = tree.xpath(xpath)
+        if matches:
+            img_url = matches[0].get('src')
+            if img_url and 'http' in img_url:
+                return img_url
+
+    og_image = tree.xpath('//meta[@property="og:image"]/@content')
+    if og_image and 'http' in og_image[0]:
+        return og_image[0]
+
+    for img in tree.xpath('//img')[:10]:
+        img_url = img.get('src')
+        if img_url and 'http' in img_url and 'logo' not in img_url.lower():
+            return img_url
+    return None
+
+
+def extract_rating(container, full_text):
+    """Rating and where it was found, using the same methods as the browser path"""
+    for span in container.xpath('.//span[contains(@class, "18wdkpi")]')[:1]:
+        rating_text = inner_text(span)
+        try:
+            return float(rating_text), 'span'
+        except ValueError:
+            pass
+
+    for span in container.iter('span'):
+        text = inner_text(span)
+        if re.match(r'^([0-5])(\.\d)?$', text):
+            return float(text), 'span'
+
+    filled_stars = full_text.count('★')
+    if 1 <= filled_stars <= 5:
+        return float(filled_stars), 'stars'
+
+    outer_html = lxml_html.tostring(container, encoding='unicode')
+    for pattern in (r'data-rating["\s:=]+([0-5]\.?\d*)', r'"rating"\s*:\s*([0-5]\.?\d*)'):
+        matches = re.findall(pattern, outer_html, re.IGNORECASE)
+        if matches and 0 <= float(matches[0]) <= 5:
+            return float(matches[0]), 'html'
+    return None, None
+
+
+def extract_reviews(tree):
+    """Same [{dateLine, date, rating, ratingSource, text}] shape as EXTRACT_REVIEWS_JS"""
+    reviews = []
+    for node in tree.xpath(REVIEW_XPATH):
+        review = {'dateLine': inner_text(node), 'date': None, 'rating': None,
+                  'ratingSource': None, 'text': None}
+
+        container = None
+        ancestors = list(node.iterancestors())
+        for parent in ancestors[1:7]:
+            parent_text = inner_text(parent)
+            if len(parent_text) > 30 and '대한민국' in parent_text:
+                container = parent
+                break
+        if container is None:
+            reviews.append(review)
+            continue
+
+        full_text = inner_text(container)
+        review['text'] = full_text
+        date_match = re.search(r'대한민국\s*\|\s*(\d{2}/\d{2}/\d{4})', full_text)
+        if date_match:
+            review['date'] = date_match.group(0)
+        review['rating'], review['ratingSource'] = extract_rating(container, full_text)
+        reviews.append(review)
+    return reviews
+
+
+def has_next_page(tree):
+    for xpath in NEXT_PAGE_XPATHS:
+        for button in tree.xpath(xpath):
+            classes = (button.get('class') or '').lower()
+            if ('disabled' in classes or button.get('disabled') is not None
+                    or button.get('aria-disabled') == 'true'):
+                continue
+            return True
+    return False
+
+
+def parse_product_page(page_html):
+    """Everything the review scraper needs from one product/review page"""
+    tree = parse_html(page_html)
+    return {
+        'price': extract_price(tree),
+        'thumbnail_url': extract_thumbnail(tree),
+        'reviews': extract_reviews(tree),
+        'has_next': has_next_page(tree)
+    }
+
+
+
+# --- Product detail sections (DecathlonTrulyFinalCrawler) ---
+
+BRAND_KEYWORDS = {'QUECHUA': ['quechua'], 'KIPRUN': ['kiprun'],
+                  'KALENJI': ['kalenji'], 'FORCLAZ': ['forclaz'],
+                  'SIMOND': ['simond']}
+
+COMPOSITION_CLASSES = {'css-1ka3tud', 'css-xb0py4', 'css-ksmov6'}
+
+
+def text_content(element):
+    """DOM textContent (includes hidden text, like the browser-side extractors)"""
+    return element.text_content()
+
+
+def following_until_h2(h2):
+    """Siblings after an h2, up to the next h2"""
+    current = h2.getnext()
+    while current is not None:
+        if isinstance(current.tag, str):  # Skip comments, like nextElementSibling
+            if current.tag.lower() == 'h2':
+                break
+            yield current
+        current = current.getnext()
+
+
+def is_inside(element, container):
+    return container is not None and any(parent is container for parent in element.iterancestors())
+
+
+def index_product_page(tree):
+    """Single pass over the DOM collecting every element the section extractors use"""
+    index = {
+        'title': None, 'h1': None, 'body': None, 'h2s': [],
+        'benefits_wrapper': None, 'popup': None,
+        'panels': [], 'benefit_rows': [], 'composition_divs': []
+    }
+    for el in tree.iter():
+        tag = el.tag
+        if not isinstance(tag, str):
+            continue
+        if tag == 'h2':
+            index['h2s'].append((el, text_content(el)))
+        elif tag == 'h1' and index['h1'] is None:
+            index['h1'] = el
+        elif tag == 'title' and index['title'] is None:
+            index['title'] = el
+        elif tag == 'body' and index['body'] is None:
+            index['body'] = el
+
+        testid = el.get('data-testid')
+        if testid:
+            if testid == 'product-benefits-wrapper' and index['benefits_wrapper'] is None:
+                index['benefits_wrapper'] = el
+            elif testid == 'additionalinfo-popup' and index['popup'] is None:
+                index['popup'] = el
+            elif testid.startswith('benefit-row-'):
+                index['benefit_rows'].append(el)
+
+        classes = el.get('class')
+        if classes:
+            if 'accordion__item-panel' in classes:
+                index['panels'].append(el)
+            if COMPOSITION_CLASSES.intersection(classes.split()):
+                index['composition_divs'].append(el)
+    return index
+
+
+def extract_basic_info(index, url):
+    info = {}
+    match = re.search(r'(\d+)\.html$', url)
+    info['상품ID'] = match.group(1) if match else ''
+
+    page_title = text_content(index['title']).split('|')[0].strip() if index['title'] is not None else ''
+    h1_text = text_content(index['h1']).strip() if index['h1'] is not None else ''
+    info['상품명'] = h1_text or page_title
+
+    name_lower = info['상품명'].lower()
+    url_lower = url.lower()
+    info['브랜드'] = 'DECATHLON'
+    for brand, keywords in BRAND_KEYWORDS.items():
+        if any(kw in name_lower or kw in url_lower for kw in keywords):
+            info['브랜드'] = brand
+            break
+    return info
+
+
+def extract_description(index):
+    for h2, h2_text in index['h2s']:
+        if '설명' not in h2_text:
+            continue
+        h3_texts = []
+        for current in following_until_h2(h2):
+            if current.tag == 'h3':
+                h3_texts.append(text_content(current).strip())
+            h3_texts.extend(text_content(h3).strip() for h3 in current.iter('h3') if h3 is not current)
+        if h3_texts:
+            return '\n'.join([t for t in h3_texts if len(t) > 10])[:1000]
+    return ""
+
+
+def _section_after_h2(h2s, keywords):
+    for h2, h2_text in h2s:
+        if not any(keyword in h2_text for keyword in keywords):
+            continue
+        contents = []
+        for current in following_until_h2(h2):
+            text = text_content(current).strip()
+            if text and len(text) > 10:
+                contents.append(text)
+        if contents:
+            return '\n'.join(contents)[:1000]
+    return ""
+
+
+def extract_features(index):
+    wrapper = index['benefits_wrapper']
+    if wrapper is None:
+        return ""
+    return _section_after_h2([h for h in index['h2s'] if is_inside(h[0], wrapper)], ['특징'])
+
+
+def extract_technical_info(index):
+    popup = index['popup'] if index['popup'] is not None else index['body']
+    if popup is not None:
+        panels = [p for p in index['panels'] if is_inside(p, popup)]
+        tech_items = [text_content(p).strip() for p in panels]
+        tech_items = [t for t in tech_items if t and len(t) > 10]
+        if tech_items:
+            return '\n'.join(tech_items)[:1000]
+
+    wrapper = index['benefits_wrapper']
+    if wrapper is not None:
+        rows = [r for r in index['benefit_rows'] if is_inside(r, wrapper)]
+        items = [text_content(r).strip() for r in rows]
+        items = [t for t in items if t and len(t) > 5]
+        if items:
+            return '\n'.join(items)[:1000]
+    return ""
+
+
+def extract_composition(index):
+    result = _section_after_h2(index['h2s'], ['구성', '추천'])
+    if result:
+        return result
+    texts = [text_content(d).strip() for d in index['composition_divs']]
+    texts = [t for t in texts if t and len(t) > 10]
+    return '\n'.join(texts)[:1000] if texts else ""
+
+
+def extract_care(index):
+    if index['body'] is None:
+        return ""
+    matches = re.findall(r'(드라이 클리닝.*?표백제.*?사용금지)', inner_text(index['body']), re.DOTALL)
+    return matches[0].strip()[:500] if matches else ""
+
+
+def extract_product_details(page_html, url):
+    """Same product_data dict as DecathlonTrulyFinalCrawler.extract_product_info,
+    from one page_source dump (parse once, one pass to index, then the five sections)"""
+    index = index_product_page(parse_html(page_html))
+    product_data = {
+        "상품ID": "",
+        "상품명": "",
+        "브랜드": "",
+        "설명": "",
+        "특징 및 장점": "",
+        "기술 정보": "",
+        "구성/추천": "",
+        "관리 지침": "",
+        "URL": url
+    }
+    product_data.update(extract_basic_info(index, url))
+    product_data['설명'] = extract_description(index)
+    product_data['특징 및 장점'] = extract_features(index)
+    product_data['기술 정보'] = extract_technical_info(index)
+    product_data['구성/추천'] = extract_composition(index)
+    product_data['관리 지침'] = extract_care(index)
+    return product_data
+
+
+def _extract_page(page):
+    url, page_html = page
+    return extract_product_details(page_html, url)
+
+
+def extract_product_details_many(pages, workers=None):
+    """Extract many saved (url, html) pages on all CPU cores"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_extract_page, pages, chunksize=8))
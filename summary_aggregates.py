@@ -0,0 +1,282 @@
+"""
+summary.csv from review files, with mergeable partial aggregates
+
+The numbers in summary.csv are sums: review count, rating sum, one count per
+sentiment, plus the first and last review date. A partial keeps exactly
+those per product, so the partials of several crawl shards or days add up to
+the summary of all of them without reading the raw reviews again:
+
+    python summary_aggregates.py data/day1/complete.csv --partials day1.json
+    python summary_aggregates.py data/day2/complete_parquet --partials day2.json
+    python summary_aggregates.py --merge day1.json day2.json --products summary.csv --summary merged.csv
+
+Review files are read in batches and grouped by product_id with pyarrow's
+group_by (a plain csv loop when pyarrow is not installed). Partials count
+every row they are given, so shards must not contain the same reviews.
+Review rows carry no price, URL or thumbnail; --products takes them from an
+existing summary.csv.
+"""
+
+import argparse
+import csv
+import json
+import os
+from crawl_state import detect_delimiter, write_json_atomic
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as ds
+except ImportError:  # Falls back to the csv module
+    pa = pc = pa_csv = ds = None
+
+SUMMARY_FIELDS = ['product_id', 'product_name', 'category', 'subcategory', 'brand',
+                  'price', 'avg_rating', 'total_reviews', 'positive_reviews',
+                  'mixed_reviews', 'negative_reviews', 'url', 'thumbnail_url']
+
+COUNTERS = ('total_reviews', 'positive_reviews', 'mixed_reviews', 'negative_reviews', 'ratings_sum')
+PRODUCT_FIELDS = ('product_name', 'category', 'subcategory', 'brand')
+SENTIMENTS = ('positive', 'mixed', 'negative')
+
+PARTIALS_VERSION = 1
+
+
+def new_partial(product_id, product=None):
+    """Empty aggregate in DecathlonReviewScraper.product_summaries form, plus the date range"""
+    product = product or {}
+    partial = {'product_id': str(product_id)}
+    for key in PRODUCT_FIELDS:
+        partial[key] = product.get(key, '')
+    for key in COUNTERS:
+        partial[key] = 0
+    partial.update({'price': None, 'url': '', 'thumbnail_url': None,
+                    'first_date': None, 'last_date': None})
+    return partial
+
+
+def _min_date(a, b):
+    return min(a, b) if a and b else a or b
+
+
+def _max_date(a, b):
+    return max(a, b) if a and b else a or b
+
+
+def merge_partial(existing, partial):
+    """Add partial into existing. Counters add up, dates widen, newer price/URL/thumbnail win"""
+    for key in COUNTERS:
+        existing[key] += partial.get(key, 0)
+    for key in PRODUCT_FIELDS:
+        existing[key] = existing.get(key) or partial.get(key, '')
+    existing['price'] = partial.get('price') or existing.get('price')
+    existing['url'] = partial.get('url') or existing.get('url', '')
+    existing['thumbnail_url'] = partial.get('thumbnail_url') or existing.get('thumbnail_url')
+    existing['first_date'] = _min_date(existing.get('first_date'), partial.get('first_date'))
+    existing['last_date'] = _max_date(existing.get('last_date'), partial.get('last_date'))
+    return existing
+
+
+def merge_partials(*partial_maps):
+    """Combine {product_id: partial} maps (from shards, days or workers) into a new map"""
+    merged = {}
+    for partials in partial_maps:
+        for product_id, partial in partials.items():
+            if product_id in merged:
+                merge_partial(merged[product_id], partial)
+            else:
+                merged[product_id] = merge_partial(new_partial(product_id), partial)
+    return merged
+
+
+def _review_date(value):
+    value = str(value) if value is not None else ''
+    return value if value and value != 'Unknown' else None
+
+
+def aggregate_rows(rows, partials=None):
+    """Fold review rows (REVIEW_FIELDS dicts) into partials. Returns the partials"""
+    partials = partials if partials is not None else {}
+    for row in rows:
+        product_id = str(row['product_id'])
+        partial = partials.get(product_id)
+        if partial is None:
+            partial = partials[product_id] = new_partial(product_id, row)
+        partial['total_reviews'] += 1
+        partial['ratings_sum'] += float(row['rating'] or 0)
+        partial[f"{row['sentiment']}_reviews"] += 1
+        review_date = _review_date(row['date'])
+        partial['first_date'] = _min_date(partial['first_date'], review_date)
+        partial['last_date'] = _max_date(partial['last_date'], review_date)
+    return partials
+
+
+def aggregate_table(table, partials=None):
+    """Fold an Arrow table/record batch of reviews into partials with one group_by"""
+    partials = partials if partials is not None else {}
+    if table.num_rows == 0:
+        return partials
+    if isinstance(table, pa.RecordBatch):
+        table = pa.Table.from_batches([table])
+    dates = table['date'].cast(pa.string())
+    dates = pc.if_else(pc.equal(dates, 'Unknown'), pa.scalar(None, pa.string()), dates)
+    columns = {
+        'product_id': table['product_id'].cast(pa.string()),
+        'rating': pc.fill_null(table['rating'].cast(pa.float64()), 0.0),
+        'date': dates
+    }
+    sentiment = table['sentiment'].cast(pa.string())
+    for name in SENTIMENTS:
+        columns[name] = pc.equal(sentiment, name).cast(pa.int64())
+    for key in PRODUCT_FIELDS:
+        columns[key] = table[key].cast(pa.string())
+
+    grouped = pa.table(columns).group_by('product_id').aggregate(
+        [('rating', 'count', pc.CountOptions(mode='all')), ('rating', 'sum'),
+         ('date', 'min'), ('date', 'max')]
+        + [(name, 'sum') for name in SENTIMENTS]
+        + [(key, 'max') for key in PRODUCT_FIELDS])
+
+    for row in grouped.to_pylist():
+        partial = new_partial(row['product_id'], {key: row[f'{key}_max'] or '' for key in PRODUCT_FIELDS})
+        partial['total_reviews'] = row['rating_count']
+        partial['ratings_sum'] = row['rating_sum'] or 0.0
+        for name in SENTIMENTS:
+            partial[f'{name}_reviews'] = row[f'{name}_sum'] or 0
+        partial['first_date'] = row['date_min']
+        partial['last_date'] = row['date_max']
+        if row['product_id'] in partials:
+            merge_partial(partials[row['product_id']], partial)
+        else:
+            partials[row['product_id']] = partial
+    return partials
+
+
+def _csv_batches(filename, block_size):
+    string_columns = ['product_id', 'product_name', 'category', 'subcategory', 'brand',
+                      'review_text', 'sentiment', 'date']
+    reader = pa_csv.open_csv(
+        filename,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        parse_options=pa_csv.ParseOptions(delimiter=detect_delimiter(filename), newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={**{name: pa.string() for name in string_columns}, 'rating': pa.float64()}))
+    for batch in reader:
+        yield batch
+
+
+def aggregate_file(path, partials=None, block_size=16 << 20):
+    """Stream one review file into partials: complete.csv (comma or tab) or a Parquet dataset/file"""
+    partials = partials if partials is not None else {}
+    is_parquet = os.path.isdir(path) or path.endswith('.parquet')
+    if pa is None:
+        if is_parquet:
+            raise ImportError("Reading Parquet reviews needs pyarrow: pip install pyarrow")
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return aggregate_rows(csv.DictReader(f, delimiter=detect_delimiter(path)), partials)
+
+    if is_parquet:
+        if os.path.isdir(path):
+            from parquet_output import read_reviews_dataset
+            dataset = read_reviews_dataset(path)
+        else:
+            dataset = ds.dataset(path, format='parquet')
+        batches = dataset.to_batches()
+    else:
+        batches = _csv_batches(path, block_size)
+    for batch in batches:
+        aggregate_table(batch, partials)
+    return partials
+
+
+def save_partials(partials, path, sources=None):
+    write_json_atomic(path, {'version': PARTIALS_VERSION, 'sources': sources or [], 'products': partials})
+    print(f"💾 Saved partial aggregates for {len(partials)} products: {path}")
+
+
+def load_partials(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != PARTIALS_VERSION:
+        raise ValueError(f"{path}: unsupported partials version {data.get('version')}")
+    return data['products']
+
+
+def apply_products(partials, summary_file):
+    """Fill price/URL/thumbnail (and missing names) from an existing summary.csv"""
+    with open(summary_file, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f, delimiter=detect_delimiter(summary_file)):
+            partial = partials.get(row['product_id'])
+            if partial is None:
+                continue
+            partial['price'] = partial['price'] or (int(float(row['price'])) if row['price'] else None)
+            partial['url'] = partial['url'] or row['url']
+            partial['thumbnail_url'] = partial['thumbnail_url'] or row['thumbnail_url'] or None
+            for key in PRODUCT_FIELDS:
+                if not partial[key] or partial[key] == 'Unknown Product':
+                    partial[key] = row[key]
+    return partials
+
+
+def summary_record(summary):
+    """summary.csv row of one aggregate (average rating instead of the running sum)"""
+    total = summary['total_reviews']
+    return {
+        'product_id': summary['product_id'],
+        'product_name': summary['product_name'],
+        'category': summary['category'],
+        'subcategory': summary['subcategory'],
+        'brand': summary['brand'],
+        'price': summary['price'],
+        'avg_rating': round(summary['ratings_sum'] / total, 1) if total > 0 else 0.0,
+        'total_reviews': total,
+        'positive_reviews': summary['positive_reviews'],
+        'mixed_reviews': summary['mixed_reviews'],
+        'negative_reviews': summary['negative_reviews'],
+        'url': summary['url'],
+        'thumbnail_url': summary['thumbnail_url']
+    }
+
+
+def write_summary(partials, filename):
+    """summary.csv (or summary.parquet) from partials"""
+    records = [summary_record(partial) for partial in partials.values()]
+    if filename.endswith('.parquet'):
+        from parquet_output import write_summary_parquet
+        write_summary_parquet(records, filename)
+    else:
+        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+    print(f"✅ Saved {len(records)} product summaries to {filename}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build summary.csv from review files or merged partial aggregates')
+    parser.add_argument('reviews', nargs='*', help='complete.csv files and/or Parquet review datasets')
+    parser.add_argument('--merge', nargs='+', default=[], help='Partial aggregate JSON files to add in')
+    parser.add_argument('--partials', help='Save the combined partial aggregates to this JSON file')
+    parser.add_argument('--products', help='summary.csv to take price/URL/thumbnail from')
+    parser.add_argument('--summary', help='Write summary.csv (or a .parquet file)')
+    args = parser.parse_args()
+    if not args.reviews and not args.merge:
+        parser.error('give review files and/or --merge partials')
+
+    partial_maps = [load_partials(path) for path in args.merge]
+    for path in args.reviews:
+        partials = aggregate_file(path)
+        print(f"📊 {path}: {sum(p['total_reviews'] for p in partials.values())} reviews, {len(partials)} products")
+        partial_maps.append(partials)
+    partials = merge_partials(*partial_maps)
+
+    if args.products:
+        apply_products(partials, args.products)
+    if args.partials:
+        save_partials(partials, args.partials, sources=args.merge + args.reviews)
+    if args.summary:
+        write_summary(partials, args.summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+static_parser must read review pages exactly like EXTRACT_REVIEWS_JS
+
+The HTTP and async backends use the lxml parser, the browser backend the
+in-page JS. Both run here on the same synthetic product page (the fixture
+server's HTML) and must produce the same review rows. The browser half is
+skipped when Chrome cannot be started.
+
+    python -m pytest test_static_parser.py
+"""
+
+import threading
+import unittest
+from selenium.common.exceptions import WebDriverException
+from browser import create_driver
+from decathlon_crawler import DecathlonReviewScraper, EXTRACT_REVIEWS_JS
+from fixture_server import FixtureServer, SyntheticCatalog
+from static_parser import REVIEW_XPATH, parse_product_page
+
+REVIEWS_PER_PAGE = 8
+
+
+class StaticParserMatchesBrowser(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FixtureServer(synthetic=SyntheticCatalog(products=1, pages=2,
+                                                              reviews_per_page=REVIEWS_PER_PAGE))
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = cls.server.product_urls()[0]
+        cls.page_html = cls.server.lookup(cls.url[len(cls.server.base_url):])[0].decode('utf-8')
+        cls.scraper = DecathlonReviewScraper(backend='http')
+        cls.product_info = cls.scraper.extract_product_info_from_url(cls.url)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.scraper.http.close()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def rows(self, raw_reviews):
+        return [self.scraper.build_review(raw_review, self.product_info, idx)[0]
+                for idx, raw_review in enumerate(raw_reviews, 1)]
+
+    def static_reviews(self):
+        return parse_product_page(self.page_html)['reviews']
+
+    def browser_reviews(self):
+        try:
+            driver = create_driver(headless=True)
+        except WebDriverException as e:
+            self.skipTest(f"Chrome is not available: {e.msg}")
+        try:
+            driver.get(self.url)
+            return driver.execute_script(EXTRACT_REVIEWS_JS, REVIEW_XPATH) or []
+        finally:
+            driver.quit()
+
+    def test_static_parser_finds_every_review(self):
+        rows = self.rows(self.static_reviews())
+        self.assertEqual(len(rows), REVIEWS_PER_PAGE)
+        self.assertTrue(all(row and row['rating'] is not None and row['date'] != 'Unknown' for row in rows))
+
+    def test_same_reviews_as_browser(self):
+        static, browser = self.static_reviews(), self.browser_reviews()
+        fields = ('dateLine', 'date', 'rating', 'ratingSource')
+        self.assertEqual([{name: review[name] for name in fields} for review in static],
+                         [{name: review[name] for name in fields} for review in browser])
+        self.assertEqual(self.rows(static), self.rows(browser))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+One visit per product for reviews and product details
+
+decathlon_crawler.py and review_info.py each open every product page in
+their own Chrome. ProductPipeline starts one browser, opens each product
+page once, extracts the detail sections with DecathlonTrulyFinalCrawler's
+extractors while the page is at the top, then paginates its reviews with
+DecathlonReviewScraper's logic on the same page. Both outputs are keyed by
+product_id: complete.csv/summary.csv (or any review sink) and
+products_korean.json (and a SqliteStore, if given).
+
+    python unified_pipeline.py urls.txt --headless --lean
+"""
+
+import argparse
+import json
+import os
+import time
+from browser import create_driver
+from crawl_metrics import CrawlMetrics
+from crawl_state import dedupe_product_urls, product_id_from_url
+from politeness import PolitenessScheduler, paced
+from decathlon_crawler import DecathlonReviewScraper
+from review_info import DecathlonTrulyFinalCrawler
+
+
+class ProductPipeline:
+    """Both crawlers on one browser session, one page load per product"""
+
+    def __init__(self, headless=False, lean=False, max_pages=40, parser='html', pagination='sequential',
+                 sink=None, store=None, debug=False, politeness=None):
+        self.driver = create_driver(headless, lean)
+        self.politeness = politeness  # Optional PolitenessScheduler shared by both crawlers
+        self.store = store  # Optional SqliteStore for the product details (pass it as sink for reviews too)
+        self.reviews = DecathlonReviewScraper(headless=headless, max_pages=max_pages, lean=lean,
+                                              pagination=pagination, sink=sink, driver=self.driver,
+                                              politeness=politeness)
+        self.details = DecathlonTrulyFinalCrawler(debug=debug, parser=parser, lean=lean, driver=self.driver,
+                                                  politeness=politeness)
+
+        # One report for the whole visit: both crawlers record into the same stats
+        self.metrics = CrawlMetrics('pipeline')
+        self.reviews.metrics = self.metrics
+        self.details.metrics = self.metrics
+        self.details.waiter.share_stats(self.reviews.waiter)
+        self.details.traffic.share_stats(self.reviews.traffic)
+        self.products = {}  # product_id -> product details (products_korean.json entries)
+
+    def crawl_product(self, url):
+        with self.metrics.product(url):
+            with self.metrics.span('navigation'), paced(self.politeness, url, browser=True):
+                self.driver.get(url)
+                self.reviews.wait_for_product_page()
+
+            # Details first: the review pagination below changes the page
+            product_data = self.details.extract_product_info(url, navigate=False)
+            if product_data:
+                product_id = product_data['상품ID'] or product_id_from_url(url)
+                product_data['상품ID'] = product_id
+                self.products[product_id] = product_data
+                if self.store is not None:
+                    self.store.upsert_product_details(product_data)
+
+            self.reviews.scrape_product(url, loaded=True)
+
+    def crawl(self, urls):
+        urls = dedupe_product_urls(urls)
+        print(f"\n🚀 Crawling details and reviews of {len(urls)} products, one visit each\n")
+        for idx, url in enumerate(urls, 1):
+            print(f"\n[Product {idx}/{len(urls)}]")
+            try:
+                self.crawl_product(url)
+            except Exception as e:
+                print(f"❌ Error crawling {url}: {e}")
+
+            if idx < len(urls) and self.reviews.product_delay and self.politeness is None:
+                time.sleep(self.reviews.product_delay)
+
+    def save(self, complete='complete.csv', summary='summary.csv', products='data/products_korean.json'):
+        self.reviews.save_complete_csv(complete)
+        self.reviews.save_summary_csv(summary)
+        if self.products:
+            directory = os.path.dirname(products)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(products, 'w', encoding='utf-8') as f:
+                json.dump(list(self.products.values()), f, ensure_ascii=False, indent=2)
+            print(f"💾 Saved {len(self.products)} product details: {products}")
+
+    def report(self, metrics_base='data/crawl_metrics_pipeline'):
+        self.reviews.waiter.report()
+        self.reviews.traffic.report()
+        if self.politeness is not None:
+            self.politeness.report()
+        self.metrics.report()
+        self.metrics.write_json(f"{metrics_base}.json")
+        self.metrics.write_prometheus(f"{metrics_base}.prom")
+
+    def close(self):
+        self.reviews.close()  # Sink and checkpoint; the shared driver is ours to quit
+        self.driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crawl product details and reviews in one visit per product')
+    parser.add_argument('urls', help='File with one product URL per line')
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--lean', action='store_true', help='Block images/media/fonts/trackers')
+    parser.add_argument('--max-pages', type=int, default=40)
+    parser.add_argument('--pagination', default='sequential', choices=['sequential', 'direct'])
+    parser.add_argument('--rate', type=float,
+                        help='Adaptive pacing starting at this many page loads/s (default: 3s between products)')
+    args = parser.parse_args()
+
+    with open(args.urls, encoding='utf-8') as f:
+        urls = [line.strip() for line in f if line.strip()]
+
+    politeness = PolitenessScheduler(rate=args.rate) if args.rate else None
+    pipeline = ProductPipeline(headless=args.headless, lean=args.lean, max_pages=args.max_pages,
+                               pagination=args.pagination, politeness=politeness)
+    try:
+        pipeline.crawl(urls)
+        pipeline.save()
+        pipeline.report()
+    finally:
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    main()
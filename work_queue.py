@@ -0,0 +1,306 @@
+"""
+Leased work queue for sharing one crawl between processes and machines
+
+Product URLs go into a SQLite file that every worker can open (a local disk
+for processes on one box, a shared volume for several nodes). A worker
+leases a product, heartbeats while it crawls it and commits the product's
+result together with marking it done. A lease that is not renewed (the
+worker died or hung) expires and the product goes back to pending, so no
+product is lost. A commit is only accepted from the lease that is still
+current, so a product taken over from a slow worker is stored once.
+
+    scraper = DecathlonReviewScraper(work_queue=WorkQueue('data/work_queue.db'))
+    scraper.scrape_all_products(urls)       # on every node; URLs are enqueued once
+
+    python work_queue.py data/work_queue.db status
+    python work_queue.py data/work_queue.db export --complete complete.csv --summary summary.csv
+
+Committed results are the exactly-once output of the whole crawl; each
+node's own sink only holds what that node crawled.
+
+WAL mode needs shared memory that only works on one host, so on a volume
+several machines mount open the queue with shared=True (rollback journal).
+SQLite locking over a network file system is only as safe as the file
+system's own locks, so the volume needs working POSIX locks.
+"""
+
+import argparse
+import csv
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_items (
+    queue       TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',  -- pending, leased, done, failed
+    owner       TEXT,
+    token       TEXT,                              -- Changes with every lease
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    result      TEXT,                              -- JSON committed with the item
+    updated_at  REAL,
+    PRIMARY KEY (queue, url)
+);
+CREATE INDEX IF NOT EXISTS idx_work_items_status ON work_items (queue, status, lease_until);
+"""
+
+
+class LeaseLost(Exception):
+    """The lease expired and another worker may have taken the item over"""
+
+
+class WorkQueue:
+    """SQLite-backed queue with expiring leases. One instance per process; threads may share it"""
+
+    def __init__(self, path='data/work_queue.db', name='reviews', lease_seconds=120, max_attempts=3,
+                 worker_id=None, shared=False):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.name = name  # Queue name: both crawlers can share one file
+        self.lease_seconds = lease_seconds  # A lease not renewed for this long goes back to pending
+        self.max_attempts = max_attempts  # Failed attempts before an item is given up
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._tokens = {}  # url -> token of the leases this process holds
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        # WAL's shared-memory index does not work across machines: rollback journal on shared volumes
+        self.conn.execute('PRAGMA journal_mode=DELETE' if shared else 'PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE takes the write lock up front, so two workers never lease the same item"""
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+
+    def enqueue(self, urls):
+        """Add URLs that are not in the queue yet. Returns how many were added"""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO work_items (queue, url, updated_at) VALUES (?, ?, ?)',
+                             [(self.name, url, now) for url in urls])
+            return conn.total_changes - before
+
+    def requeue_expired(self, conn=None):
+        """Put items whose lease ran out back to pending (failed after max_attempts). Returns how many"""
+        now = time.time()
+        sql = ("UPDATE work_items SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+               "owner = NULL, token = NULL, lease_until = NULL, error = 'lease expired', updated_at = ? "
+               "WHERE queue = ? AND status = 'leased' AND lease_until < ?")
+        params = (self.max_attempts, now, self.name, now)
+        if conn is not None:
+            return conn.execute(sql, params).rowcount
+        with self._transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def lease(self, limit=1):
+        """Lease up to limit pending items. Returns their URLs (empty when nothing is pending)"""
+        now = time.time()
+        with self._transaction() as conn:
+            expired = self.requeue_expired(conn)
+            if expired:
+                print(f"♻️ {expired} expired lease(s) taken back")
+            rows = conn.execute("SELECT url FROM work_items WHERE queue = ? AND status = 'pending' "
+                                "ORDER BY attempts, rowid LIMIT ?", (self.name, limit)).fetchall()
+            leased = []
+            for (url,) in rows:
+                token = uuid.uuid4().hex
+                conn.execute("UPDATE work_items SET status = 'leased', owner = ?, token = ?, lease_until = ?, "
+                             "attempts = attempts + 1, updated_at = ? WHERE queue = ? AND url = ?",
+                             (self.worker_id, token, now + self.lease_seconds, now, self.name, url))
+                self._tokens[url] = token
+                leased.append(url)
+            return leased
+
+    def _update_leased(self, url, sql, params):
+        """Run an UPDATE that only applies while our lease is current. Returns False if it was lost"""
+        token = self._tokens.get(url)
+        if token is None:
+            return False
+        with self._transaction() as conn:
+            changed = conn.execute(f"UPDATE work_items SET {sql} WHERE queue = ? AND url = ? "
+                                   f"AND status = 'leased' AND token = ?",
+                                   (*params, self.name, url, token)).rowcount
+        return changed == 1
+
+    def holds(self, url):
+        return url in self._tokens
+
+    def renew(self, url):
+        """Extend the lease. Returns False when it already expired and was taken over"""
+        now = time.time()
+        if self._update_leased(url, 'lease_until = ?, updated_at = ?', (now + self.lease_seconds, now)):
+            return True
+        self._tokens.pop(url, None)
+        return False
+
+    def complete(self, url, result=None):
+        """Commit the item's result and mark it done, atomically. Raises LeaseLost if the lease is gone"""
+        done = self._update_leased(url, "status = 'done', result = ?, error = NULL, lease_until = NULL, "
+                                        "updated_at = ?",
+                                   (json.dumps(result, ensure_ascii=False) if result is not None else None,
+                                    time.time()))
+        self._tokens.pop(url, None)
+        if not done:
+            raise LeaseLost(f"Lease on {url} expired before its result was committed")
+
+    def release(self, url, error=None):
+        """Give the item back (pending again, or failed after max_attempts)"""
+        self._update_leased(url, "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                                 "owner = NULL, token = NULL, lease_until = NULL, error = ?, updated_at = ?",
+                            (self.max_attempts, error, time.time()))
+        self._tokens.pop(url, None)
+
+    @contextmanager
+    def heartbeat(self, urls):
+        """Renew the leases on urls in the background while the block runs"""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                for url in urls:
+                    if self.holds(url) and not self.renew(url):
+                        print(f"⚠️ Lost the lease on {url}; another worker will redo it")
+
+        thread = threading.Thread(target=beat, name='lease-heartbeat', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def outstanding(self):
+        """Items still pending or leased by anyone"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM work_items WHERE queue = ? "
+                                     "AND status IN ('pending', 'leased')", (self.name,)).fetchone()[0]
+
+    def leases(self, limit=1, poll=0.5):
+        """Lease batches of up to limit URLs until the queue is drained, heartbeating while the
+        caller works on each batch. Items the caller did not complete are released for a retry.
+        While other workers hold the last leases, waits for them to finish or expire"""
+        while True:
+            urls = self.lease(limit)
+            if not urls:
+                if not self.outstanding():
+                    return
+                time.sleep(poll)
+                continue
+            with self.heartbeat(urls):
+                yield urls
+            for url in urls:
+                if self.holds(url):
+                    self.release(url, 'no result')
+
+    def counts(self):
+        with self._lock:
+            rows = self.conn.execute('SELECT status, COUNT(*) FROM work_items WHERE queue = ? GROUP BY status',
+                                     (self.name,)).fetchall()
+        return dict(rows)
+
+    def results(self):
+        """(url, result) of every finished item"""
+        with self._lock:
+            rows = self.conn.execute("SELECT url, result FROM work_items WHERE queue = ? AND status = 'done' "
+                                     "ORDER BY rowid", (self.name,)).fetchall()
+        return [(url, json.loads(result) if result else None) for url, result in rows]
+
+    def reset(self, failed=True, leased=False):
+        """Put failed (and optionally leased) items back to pending"""
+        statuses = ['failed'] * failed + ['leased'] * leased
+        if not statuses:
+            return 0
+        with self._transaction() as conn:
+            return conn.execute(f"UPDATE work_items SET status = 'pending', owner = NULL, token = NULL, "
+                                f"attempts = 0, updated_at = ? WHERE queue = ? "
+                                f"AND status IN ({','.join('?' * len(statuses))})",
+                                (time.time(), self.name, *statuses)).rowcount
+
+    def report(self):
+        counts = self.counts()
+        print(f"\n📬 Work queue {self.name} ({self.path}): " +
+              ", ".join(f"{status}: {n}" for status, n in sorted(counts.items())))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def export_reviews(work_queue, complete=None, summary=None):
+    """complete.csv/summary.csv from the committed results of a reviews queue"""
+    from review_sinks import REVIEW_FIELDS
+    from summary_aggregates import merge_partials, write_summary
+
+    results = [result for _, result in work_queue.results() if result]
+    if complete:
+        with open(complete, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=REVIEW_FIELDS)
+            writer.writeheader()
+            for result in results:
+                writer.writerows(result['rows'])
+        print(f"✅ Saved {sum(len(result['rows']) for result in results)} reviews to {complete}")
+    if summary:
+        write_summary(merge_partials(*({str(result['summary']['product_id']): result['summary']}
+                                       for result in results)), summary)
+
+
+def export_products(work_queue, output):
+    """products_korean.json from the committed results of a product_info queue"""
+    products = [result for _, result in work_queue.results() if result]
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(products, f, ensure_ascii=False, indent=2)
+    print(f"💾 Saved {len(products)} products: {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or export a shared crawl work queue')
+    parser.add_argument('database')
+    parser.add_argument('command', choices=['status', 'enqueue', 'requeue', 'export'])
+    parser.add_argument('--queue', default='reviews', help="'reviews' or 'product_info'")
+    parser.add_argument('--urls', help='enqueue: file with one product URL per line')
+    parser.add_argument('--leased', action='store_true', help='requeue: also take back current leases')
+    parser.add_argument('--complete', help='export: complete.csv to write (reviews queue)')
+    parser.add_argument('--summary', help='export: summary.csv to write (reviews queue)')
+    parser.add_argument('--products', help='export: products JSON to write (product_info queue)')
+    parser.add_argument('--shared', action='store_true',
+                        help='the database is on a volume several machines mount (rollback journal, no WAL)')
+    args = parser.parse_args()
+
+    work_queue = WorkQueue(args.database, name=args.queue, shared=args.shared)
+    try:
+        if args.command == 'enqueue':
+            with open(args.urls, encoding='utf-8') as f:
+                urls = [line.strip() for line in f if line.strip()]
+            print(f"📥 Enqueued {work_queue.enqueue(urls)} new URLs")
+        elif args.command == 'requeue':
+            print(f"♻️ {work_queue.reset(failed=True, leased=args.leased)} items back to pending")
+        elif args.command == 'export':
+            if args.products:
+                export_products(work_queue, args.products)
+            if args.complete or args.summary:
+                export_reviews(work_queue, args.complete, args.summary)
+        work_queue.report()
+    finally:
+        work_queue.close()
+
+
+if __name__ == "__main__":
+    main()